@@ -13,6 +13,7 @@ from .progress import Progress
 from .quiz import Question, Quiz
 from .quiz_attempt import QuizAttempt
 from .user import User
+from .user_streak import UserStreak
 
 __all__ = [
     "User",
@@ -23,4 +24,5 @@ __all__ = [
     "QuizAttempt",
     "Progress",
     "Achievement",
+    "UserStreak",
 ]
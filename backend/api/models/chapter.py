@@ -2,9 +2,13 @@
 Chapter model for Course Companion FTE
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, TYPE_CHECKING
 
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Relationship, SQLModel
+
+if TYPE_CHECKING:
+    from backend.api.models.course import Course
+    from backend.api.models.quiz import Quiz
 
 
 class Chapter(SQLModel, table=True):
@@ -20,6 +24,8 @@ class Chapter(SQLModel, table=True):
     course_id: int = Field(foreign_key="courses.id", index=True)
     chapter_number: int = Field(ge=1)  # 1-indexed chapter number
     slug: str = Field(max_length=100, index=True)  # chapter-1-introduction
+    # Denormalized from courses.slug so chapter reads skip the courses join
+    course_slug: Optional[str] = Field(default=None, max_length=100)
 
     # Content metadata
     title: str = Field(max_length=255)
@@ -46,6 +52,16 @@ class Chapter(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_published: bool = Field(default=True)
 
+    # Explicit foreign_keys needed because of the prev/next self-references
+    course: Optional["Course"] = Relationship(
+        back_populates="chapters",
+        sa_relationship_kwargs={"foreign_keys": "Chapter.course_id"},
+    )
+    # Deliberately lazy: content/navigation reads load chapters through
+    # Course.chapters and never serialize quiz data, and the quiz service
+    # queries Quiz/Question directly rather than traversing from here
+    quizzes: List["Quiz"] = Relationship(back_populates="chapter")
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -2,9 +2,12 @@
 Course model for Course Companion FTE
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, TYPE_CHECKING
 
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Relationship, SQLModel
+
+if TYPE_CHECKING:
+    from backend.api.models.chapter import Chapter
 
 
 class Course(SQLModel, table=True):
@@ -37,6 +40,16 @@ class Course(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    # Chapters are always serialized with their course, so load them in one
+    # batched SELECT (selectin) instead of N+1 lazy loads
+    chapters: List["Chapter"] = Relationship(
+        back_populates="course",
+        sa_relationship_kwargs={
+            "lazy": "selectin",
+            "foreign_keys": "Chapter.course_id",
+        },
+    )
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -19,6 +19,9 @@ class Progress(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
     chapter_id: int = Field(foreign_key="chapters.id", index=True)
+    # Denormalized from chapters.course_id so per-user dashboard queries
+    # scan progress alone instead of joining through chapters
+    course_id: Optional[int] = Field(default=None, foreign_key="courses.id", index=True)
 
     # Completion tracking
     is_completed: bool = Field(default=False)
@@ -29,11 +32,6 @@ class Progress(SQLModel, table=True):
     last_position: int = Field(default=0, ge=0)  # Character position for resume
     last_accessed_at: datetime = Field(default_factory=datetime.utcnow)
 
-    # Streak tracking (calculated server-side)
-    current_streak: int = Field(default=0, ge=0)  # Days with activity
-    longest_streak: int = Field(default=0, ge=0)
-    last_activity_date: Optional[datetime] = Field(default=None)  # Date component only
-
     # Metadata
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -46,8 +44,6 @@ class Progress(SQLModel, table=True):
                 "is_completed": True,
                 "completed_at": "2024-01-15T14:30:00Z",
                 "time_spent_seconds": 1200,
-                "last_position": 15000,
-                "current_streak": 7,
-                "longest_streak": 14
+                "last_position": 15000
             }
         }
@@ -2,9 +2,17 @@
 Quiz model for Course Companion FTE
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, TYPE_CHECKING
 
-from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, JSON, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, Relationship, SQLModel
+
+if TYPE_CHECKING:
+    from backend.api.models.chapter import Chapter
+
+# JSONB on PostgreSQL, generic JSON elsewhere (sqlite in tests)
+_JSON_VARIANT = JSON().with_variant(JSONB(), "postgresql")
 
 
 class Quiz(SQLModel, table=True):
@@ -32,11 +40,22 @@ class Quiz(SQLModel, table=True):
     # Freemium gate
     requires_premium: bool = Field(default=False)
 
+    # Denormalized question totals (maintained by Question event listeners)
+    # Avoids SUM/COUNT over questions on every quiz fetch
+    total_points: int = Field(default=0, ge=0)
+    total_questions: int = Field(default=0, ge=0)
+
     # Metadata
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_published: bool = Field(default=True)
 
+    chapter: Optional["Chapter"] = Relationship(back_populates="quizzes")
+    # Deliberately lazy: the quiz service selects questions with its own
+    # ordered query, so eager-loading here would only tax the course and
+    # navigation reads that reach Quiz through the chapter cascade
+    questions: List["Question"] = Relationship(back_populates="quiz")
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -69,11 +88,11 @@ class Question(SQLModel, table=True):
     question_text: str = Field(max_length=1000)
     question_type: str = Field(max_length=20)  # multiple_choice|true_false|fill_in_blank
 
-    # Answer configuration (JSON serialized)
+    # Answer configuration
     # For multiple_choice: {"options": ["A", "B", "C", "D"], "correct": "A"}
     # For true_false: {"correct": true}
     # For fill_in_blank: {"correct": ["answer1", "answer2"], "case_sensitive": false}
-    answer_config: str = Field()  # JSON string
+    answer_config: dict = Field(sa_column=Column(_JSON_VARIANT, nullable=False))
 
     # Grading rules for fill-in-blank
     case_sensitive: bool = Field(default=False)
@@ -87,6 +106,8 @@ class Question(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    quiz: Optional["Quiz"] = Relationship(back_populates="questions")
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -94,7 +115,36 @@ class Question(SQLModel, table=True):
                 "question_number": 1,
                 "question_text": "What is an AI agent?",
                 "question_type": "multiple_choice",
-                "answer_config": '{"options": ["A program that uses AI", "A human operator", "A database"], "correct": "A program that uses AI"}',
+                "answer_config": {"options": ["A program that uses AI", "A human operator", "A database"], "correct": "A program that uses AI"},
                 "points": 1
             }
         }
+
+
+# Keep Quiz.total_points / Quiz.total_questions in sync as questions change.
+# Incremental UPDATEs here are cheaper than recomputing SUM/COUNT per request.
+
+@event.listens_for(Question, "after_insert")
+def _increment_quiz_totals(mapper, connection, question: Question) -> None:
+    quiz_table = Quiz.__table__
+    connection.execute(
+        quiz_table.update()
+        .where(quiz_table.c.id == question.quiz_id)
+        .values(
+            total_points=quiz_table.c.total_points + question.points,
+            total_questions=quiz_table.c.total_questions + 1,
+        )
+    )
+
+
+@event.listens_for(Question, "after_delete")
+def _decrement_quiz_totals(mapper, connection, question: Question) -> None:
+    quiz_table = Quiz.__table__
+    connection.execute(
+        quiz_table.update()
+        .where(quiz_table.c.id == question.quiz_id)
+        .values(
+            total_points=quiz_table.c.total_points - question.points,
+            total_questions=quiz_table.c.total_questions - 1,
+        )
+    )
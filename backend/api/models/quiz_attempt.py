@@ -4,8 +4,14 @@ Quiz Attempt model for Course Companion FTE
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Column, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel
 
+# JSONB on PostgreSQL (parsed once at insert, queryable, GIN-indexable);
+# generic JSON elsewhere (sqlite in tests)
+_JSON_VARIANT = JSON().with_variant(JSONB(), "postgresql")
+
 
 class QuizAttempt(SQLModel, table=True):
     """
@@ -22,10 +28,10 @@ class QuizAttempt(SQLModel, table=True):
     # Attempt tracking
     attempt_number: int = Field(ge=1)  # 1st attempt, 2nd attempt, etc.
 
-    # Answers (JSON serialized)
+    # Answers
     # Format: {"1": "A", "2": "true", "3": "machine learning"}
     # Keys are question_numbers, values are user answers
-    answers: str = Field()  # JSON string
+    answers: dict = Field(sa_column=Column(_JSON_VARIANT, nullable=False))
 
     # Grading results (computed by backend using answer keys)
     score: int = Field(ge=0, le=100)  # Percentage
@@ -38,9 +44,9 @@ class QuizAttempt(SQLModel, table=True):
     submitted_at: Optional[datetime] = Field(default=None)
     time_taken_seconds: Optional[int] = Field(default=None, ge=0)
 
-    # Detailed feedback (JSON serialized)
-    # Format: {"1": {"correct": true, "explanation": "..."}, ...}
-    feedback: Optional[str] = Field(default=None)  # JSON string
+    # Detailed feedback
+    # Format: [{"question_id": 1, "is_correct": true, "explanation": "..."}, ...]
+    feedback: Optional[list] = Field(default=None, sa_column=Column(_JSON_VARIANT, nullable=True))
 
     # Metadata
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -51,7 +57,7 @@ class QuizAttempt(SQLModel, table=True):
                 "user_id": 1,
                 "quiz_id": 1,
                 "attempt_number": 1,
-                "answers": '{"1": "A program that uses AI", "2": "true", "3": "machine learning"}',
+                "answers": {"1": "A program that uses AI", "2": "true", "3": "machine learning"},
                 "score": 85,
                 "correct_count": 17,
                 "total_questions": 20,
@@ -4,6 +4,7 @@ User model for Course Companion FTE
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Column, LargeBinary
 from sqlmodel import Field, SQLModel
 
 
@@ -21,7 +22,9 @@ class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(max_length=255)
     email: str = Field(unique=True, index=True, max_length=255)
-    hashed_password: str = Field(max_length=255)
+    # bcrypt output is fixed-width binary; BYTEA(60) keeps the auth-hot
+    # users row narrow and skips per-row UTF-8 validation
+    hashed_password: bytes = Field(sa_column=Column(LargeBinary(60), nullable=False))
 
     # Tier management
     tier: str = Field(default="free", max_length=20)  # free|premium|pro|team
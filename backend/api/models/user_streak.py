@@ -0,0 +1,37 @@
+"""
+User streak model for Course Companion FTE
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class UserStreak(SQLModel, table=True):
+    """
+    User streak model - one row per user with streak state.
+
+    Streaks are a per-user quantity; keeping them here makes streak reads
+    a primary-key lookup and writes a single-row update (previously the
+    values were duplicated across every progress row).
+    """
+    __tablename__ = "user_streaks"
+
+    user_id: int = Field(primary_key=True, foreign_key="users.id")
+
+    current_streak: int = Field(default=0, ge=0)  # Days with activity
+    longest_streak: int = Field(default=0, ge=0)
+    last_activity_date: Optional[datetime] = Field(default=None)  # Date component only
+
+    # Metadata
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "user_id": 1,
+                "current_streak": 7,
+                "longest_streak": 14,
+                "last_activity_date": "2024-01-15T00:00:00Z"
+            }
+        }
@@ -2,8 +2,9 @@
 Content routes for Course Companion FTE
 Handles course and chapter content delivery
 """
+import hashlib
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.schemas.content import (
@@ -22,6 +23,11 @@ from backend.api.middleware.auth import get_current_user, get_current_user_optio
 
 router = APIRouter(prefix="/content", tags=["content"])
 
+# Course listings change rarely; let browsers/CDN serve them for a
+# minute and keep serving the stale copy while revalidating in the
+# background instead of stampeding the DB
+_COURSE_LIST_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
 
 def get_content_service(
     db: AsyncSession = Depends(get_db_session),
@@ -35,20 +41,41 @@ def get_content_service(
 
 @router.get("/courses", response_model=CourseListResponse)
 async def list_courses(
+    request: Request,
+    response: Response,
     service: ContentService = Depends(get_content_service),
     current_user: Optional[User] = Depends(get_current_user_optional)
-) -> CourseListResponse:
+):
     """
     List all available courses
 
     Returns a list of published courses with metadata.
     Authentication is optional - authenticated users may see additional information.
 
+    Responses carry an ETag and Cache-Control headers, so unchanged
+    listings are answered with 304 Not Modified (no body re-serialized
+    or transferred) and repeat views within the cache window never
+    reach the server at all.
+
     Returns:
         CourseListResponse with list of courses and total count
     """
     courses = await service.list_courses(user=current_user, published_only=True)
 
+    # Fingerprint the listing by id + last update; any publish/edit
+    # changes updated_at and therefore the ETag
+    fingerprint = ",".join(f"{course.id}:{course.updated_at}" for course in courses)
+    etag = f'"{hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()}"'
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": _COURSE_LIST_CACHE_CONTROL},
+        )
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _COURSE_LIST_CACHE_CONTROL
+
     course_responses = [
         CourseResponse(
             id=course.id,
@@ -77,15 +104,23 @@ async def list_courses(
 @router.get("/courses/{slug}", response_model=CourseDetailResponse)
 async def get_course_by_slug(
     slug: str,
+    request: Request,
+    response: Response,
     service: ContentService = Depends(get_content_service),
     current_user: Optional[User] = Depends(get_current_user_optional)
-) -> CourseDetailResponse:
+):
     """
     Get course details by slug
 
     Includes course metadata and list of all chapters.
     If authenticated, includes user's progress information.
 
+    For authenticated users the response carries a weak ETag derived
+    from the course's and the user's latest progress updated_at, so UI
+    polls where nothing changed short-circuit with 304 Not Modified
+    after one indexed MAX() aggregate instead of re-reading every
+    chapter and progress row.
+
     Args:
         slug: Course slug (e.g., 'ai-agent-development')
         current_user: Optional authenticated user
@@ -97,6 +132,26 @@ async def get_course_by_slug(
         HTTPException 404: If course not found
     """
     course = await service.get_course_by_slug(slug)
+
+    if current_user:
+        last_progress = await service.get_progress_last_update(
+            user_id=current_user.id,
+            course_id=course.id
+        )
+        last_changed = (
+            max(last_progress, course.updated_at)
+            if last_progress else course.updated_at
+        )
+        etag = f'W/"{int(last_changed.timestamp())}"'
+
+        if request.headers.get("if-none-match") == etag:
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag},
+            )
+
+        response.headers["ETag"] = etag
+
     chapters = await service.get_course_chapters(course.id, user=current_user)
 
     # Build chapter list items
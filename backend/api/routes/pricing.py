@@ -2,8 +2,10 @@
 Pricing routes for Course Companion FTE
 Handles subscription tiers, upgrades, and billing (mock implementation)
 """
+import sys
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
@@ -83,12 +85,26 @@ TIER_DEFINITIONS = [
     }
 ]
 
+# Intern the feature strings so every response shares the same str objects
+for _tier_def in TIER_DEFINITIONS:
+    _tier_def["features"] = tuple(sys.intern(f) for f in _tier_def["features"])
+
+# Tier models are static marketing data - build them once at import time
+# and share the frozen instances across all responses
+TIERS = tuple(SubscriptionTier(**tier_def) for tier_def in TIER_DEFINITIONS)
+
+_ANONYMOUS_PRICING = PricingResponse(tiers=list(TIERS), current_tier=None)
+
+# Fully serialized anonymous payload - the unauthenticated pricing call
+# skips pydantic and JSON encoding entirely and just sends these bytes
+_ANONYMOUS_PRICING_BYTES = orjson.dumps(_ANONYMOUS_PRICING.model_dump(mode="json"))
+
 
 @router.get("", response_model=PricingResponse)
 @router.get("/tiers", response_model=PricingResponse)
 async def get_pricing_tiers(
     current_user: Optional[User] = Depends(get_current_user_optional)
-) -> PricingResponse:
+) -> Response:
     """
     Get all available subscription tiers
 
@@ -102,11 +118,19 @@ async def get_pricing_tiers(
     Returns:
         PricingResponse with all tiers and optional current tier
     """
-    tiers = [SubscriptionTier(**tier_def) for tier_def in TIER_DEFINITIONS]
+    if current_user is None:
+        return Response(
+            content=_ANONYMOUS_PRICING_BYTES,
+            media_type="application/json"
+        )
 
-    return PricingResponse(
-        tiers=tiers,
-        current_tier=current_user.subscription_tier if current_user else None
+    pricing = PricingResponse(
+        tiers=list(TIERS),
+        current_tier=current_user.subscription_tier
+    )
+    return Response(
+        content=orjson.dumps(pricing.model_dump(mode="json")),
+        media_type="application/json"
     )
 
 
@@ -3,6 +3,7 @@ Progress routes for Course Companion FTE
 Handles progress tracking, streaks, and user statistics
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.schemas.progress import (
@@ -10,8 +11,7 @@ from backend.api.schemas.progress import (
     ChapterProgressResponse,
     OverallProgressResponse,
     StreakInfo,
-    StatsResponse,
-    CourseProgressSummary
+    StatsResponse
 )
 from backend.api.models.user import User
 from backend.db.session import get_db_session
@@ -69,7 +69,7 @@ async def mark_chapter_complete(
 async def get_my_progress(
     service: ProgressService = Depends(get_progress_service),
     current_user: User = Depends(get_current_user)
-) -> OverallProgressResponse:
+) -> StreamingResponse:
     """
     Get current user's overall progress
 
@@ -79,28 +79,25 @@ async def get_my_progress(
     - Total time spent
     - Achievements earned
 
+    The response is streamed as chunked JSON so users with many courses
+    get a fast time-to-first-byte and the payload is never fully
+    buffered in memory.
+
     Args:
         current_user: Authenticated user (required)
 
     Returns:
-        OverallProgressResponse with complete progress data
+        Streamed OverallProgressResponse JSON
 
     Raises:
         HTTPException 401: If not authenticated
     """
-    result = await service.get_user_progress(current_user.id)
-
-    # Build response
-    courses = [CourseProgressSummary(**course) for course in result["courses"]]
-    streak = StreakInfo(**result["streak"])
-
-    return OverallProgressResponse(
-        user_id=result["user_id"],
-        total_chapters_completed=result["total_chapters_completed"],
-        total_time_spent_seconds=result["total_time_spent_seconds"],
-        courses=courses,
-        streak=streak,
-        achievements_earned=result["achievements_earned"]
+    # "identity" keeps the gzip middleware from buffering the chunks,
+    # which would defeat the fast time-to-first-byte this stream is for
+    return StreamingResponse(
+        service.stream_overall_progress(current_user.id),
+        media_type="application/json",
+        headers={"Content-Encoding": "identity"},
     )
 
 
@@ -20,7 +20,6 @@ from backend.api.models.chapter import Chapter
 from backend.db.session import get_db_session
 from backend.services.quiz_service import QuizService
 from backend.api.middleware.auth import get_current_user
-import json
 
 
 router = APIRouter(prefix="/quizzes", tags=["quizzes"])
@@ -98,11 +97,10 @@ async def get_chapter_quiz(
 
     # Build question responses (WITHOUT correct answers)
     question_responses = []
-    total_points = 0
 
     for question in questions:
         # Parse answer config to get options for multiple choice
-        answer_config = json.loads(question.answer_config)
+        answer_config = question.answer_config
         options = answer_config.get("options", None)
 
         question_responses.append(
@@ -115,7 +113,6 @@ async def get_chapter_quiz(
                 points=question.points
             )
         )
-        total_points += question.points
 
     return QuizResponse(
         id=quiz.id,
@@ -128,7 +125,7 @@ async def get_chapter_quiz(
         time_limit_minutes=quiz.time_limit_minutes,
         requires_premium=quiz.requires_premium,
         questions=question_responses,
-        total_points=total_points,
+        total_points=quiz.total_points,
         created_at=quiz.created_at
     )
 
@@ -295,7 +292,7 @@ async def get_quiz_attempt_details(
     quiz = await service.get_quiz_by_id(quiz_id)
 
     # Parse feedback
-    feedback_data = json.loads(attempt.feedback) if attempt.feedback else []
+    feedback_data = attempt.feedback or []
     feedback_list = [QuestionFeedback(**item) for item in feedback_data]
 
     return QuizResultResponse(
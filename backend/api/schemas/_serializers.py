@@ -0,0 +1,21 @@
+"""
+Shared field serializers for Course Companion FTE schemas
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    """
+    Serialize datetimes as Unix epoch milliseconds over the wire.
+    Smaller payloads and cheaper to encode/parse than ISO-8601 strings.
+
+    The models store naive UTC datetimes (datetime.utcnow), so naive
+    values are pinned to UTC before conversion - calling .timestamp()
+    on them directly would apply the server's local offset.
+    """
+    if not value:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
@@ -2,6 +2,7 @@
 Navigation schemas for Course Companion FTE
 Request/response models for chapter navigation and course structure
 """
+from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
 
@@ -64,12 +65,14 @@ class ChapterWithProgress(ChapterListItem):
         default=None,
         description="Time user has spent on this chapter"
     )
-    completed_at: Optional[str] = Field(
+    completed_at: Optional[datetime] = Field(
         default=None,
         description="ISO timestamp when chapter was completed"
     )
 
     class Config:
+        # Accept the service's slotted row objects directly, not just dicts
+        from_attributes = True
         json_schema_extra = {
             "example": {
                 "id": 1,
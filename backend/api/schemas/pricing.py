@@ -3,8 +3,10 @@ Pricing schemas for Course Companion FTE
 Request/response models for subscription tiers and upgrades
 """
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field, field_serializer
+
+from backend.api.schemas._serializers import epoch_ms
 
 
 class SubscriptionTier(BaseModel):
@@ -15,13 +17,16 @@ class SubscriptionTier(BaseModel):
     name: str = Field(description="Display name")
     price_monthly: float = Field(description="Monthly price in USD")
     price_yearly: float = Field(description="Yearly price in USD")
-    features: List[str] = Field(description="List of features included")
+    features: Tuple[str, ...] = Field(description="Features included")
     chapter_access: str = Field(description="Chapter access description")
     quiz_access: str = Field(description="Quiz access description")
     support_level: str = Field(description="Support level")
     is_popular: bool = Field(default=False, description="Popular tier badge")
 
     class Config:
+        # Tier definitions are static marketing data; freezing lets the
+        # same instances be shared across every pricing response
+        frozen = True
         json_schema_extra = {
             "example": {
                 "tier": "premium",
@@ -101,7 +106,11 @@ class SubscriptionInfo(BaseModel):
         default=None,
         description="Number of chapters accessible (None = unlimited)"
     )
-    features_available: List[str]
+    features_available: Tuple[str, ...]
+
+    @field_serializer("subscription_start_date", "subscription_end_date")
+    def _serialize_datetimes(self, value: Optional[datetime]) -> Optional[int]:
+        return epoch_ms(value)
 
     class Config:
         json_schema_extra = {
@@ -109,8 +118,8 @@ class SubscriptionInfo(BaseModel):
                 "user_id": 1,
                 "subscription_tier": "premium",
                 "is_premium": True,
-                "subscription_start_date": "2024-01-15T00:00:00Z",
-                "subscription_end_date": "2024-02-15T00:00:00Z",
+                "subscription_start_date": 1705276800000,
+                "subscription_end_date": 1707955200000,
                 "billing_cycle": "monthly",
                 "auto_renew": True,
                 "chapters_accessible": None,
@@ -145,8 +154,8 @@ class UpgradeResponse(BaseModel):
                     "user_id": 1,
                     "subscription_tier": "premium",
                     "is_premium": True,
-                    "subscription_start_date": "2024-01-15T00:00:00Z",
-                    "subscription_end_date": "2024-02-15T00:00:00Z",
+                    "subscription_start_date": 1705276800000,
+                    "subscription_end_date": 1707955200000,
                     "billing_cycle": "monthly",
                     "auto_renew": True,
                     "chapters_accessible": None,
@@ -174,8 +183,8 @@ class CancelSubscriptionResponse(BaseModel):
                     "user_id": 1,
                     "subscription_tier": "premium",
                     "is_premium": True,
-                    "subscription_start_date": "2024-01-15T00:00:00Z",
-                    "subscription_end_date": "2024-02-15T00:00:00Z",
+                    "subscription_start_date": 1705276800000,
+                    "subscription_end_date": 1707955200000,
                     "billing_cycle": "monthly",
                     "auto_renew": False,
                     "chapters_accessible": None,
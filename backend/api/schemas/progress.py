@@ -4,7 +4,9 @@ Request/response models for progress tracking and streaks
 """
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
+
+from backend.api.schemas._serializers import epoch_ms
 
 
 class MarkChapterCompleteRequest(BaseModel):
@@ -36,15 +38,19 @@ class ChapterProgressResponse(BaseModel):
     time_spent_seconds: int
     last_accessed_at: datetime
 
+    @field_serializer("completed_at", "last_accessed_at")
+    def _serialize_datetimes(self, value: Optional[datetime]) -> Optional[int]:
+        return epoch_ms(value)
+
     class Config:
         json_schema_extra = {
             "example": {
                 "chapter_id": 1,
                 "chapter_title": "Introduction to AI Agents",
                 "is_completed": True,
-                "completed_at": "2024-01-15T14:30:00Z",
+                "completed_at": 1705329000000,
                 "time_spent_seconds": 1200,
-                "last_accessed_at": "2024-01-15T14:30:00Z"
+                "last_accessed_at": 1705329000000
             }
         }
 
@@ -62,12 +68,16 @@ class StreakInfo(BaseModel):
         description="Days remaining before streak breaks (with grace period)"
     )
 
+    @field_serializer("last_activity_date")
+    def _serialize_datetimes(self, value: Optional[datetime]) -> Optional[int]:
+        return epoch_ms(value)
+
     class Config:
         json_schema_extra = {
             "example": {
                 "current_streak": 7,
                 "longest_streak": 14,
-                "last_activity_date": "2024-01-15T14:30:00Z",
+                "last_activity_date": 1705329000000,
                 "streak_status": "active",
                 "days_until_broken": 1
             }
@@ -87,6 +97,10 @@ class CourseProgressSummary(BaseModel):
     time_spent_seconds: int
     last_accessed: Optional[datetime]
 
+    @field_serializer("last_accessed")
+    def _serialize_datetimes(self, value: Optional[datetime]) -> Optional[int]:
+        return epoch_ms(value)
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -97,7 +111,7 @@ class CourseProgressSummary(BaseModel):
                 "total_chapters": 5,
                 "progress_percentage": 60.0,
                 "time_spent_seconds": 3600,
-                "last_accessed": "2024-01-15T14:30:00Z"
+                "last_accessed": 1705329000000
             }
         }
 
@@ -144,6 +158,10 @@ class StatsResponse(BaseModel):
     days_since_signup: int
     streak: StreakInfo
 
+    @field_serializer("account_created_at")
+    def _serialize_datetimes(self, value: Optional[datetime]) -> Optional[int]:
+        return epoch_ms(value)
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -153,7 +171,7 @@ class StatsResponse(BaseModel):
                 "average_quiz_score": 85.5,
                 "total_time_spent_seconds": 7200,
                 "total_time_spent_hours": 2.0,
-                "account_created_at": "2024-01-01T00:00:00Z",
+                "account_created_at": 1704067200000,
                 "days_since_signup": 15,
                 "streak": {
                     "current_streak": 7,
@@ -4,7 +4,9 @@ Request/response models for quiz delivery and grading
 """
 from datetime import datetime
 from typing import Optional, List, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
+
+from backend.api.schemas._serializers import epoch_ms
 
 
 class QuestionResponse(BaseModel):
@@ -56,6 +58,10 @@ class QuizResponse(BaseModel):
     total_points: int
     created_at: datetime
 
+    @field_serializer("created_at")
+    def _serialize_datetimes(self, value: Optional[datetime]) -> Optional[int]:
+        return epoch_ms(value)
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -70,7 +76,7 @@ class QuizResponse(BaseModel):
                 "requires_premium": False,
                 "questions": [],
                 "total_points": 100,
-                "created_at": "2024-01-15T14:30:00Z"
+                "created_at": 1705329000000
             }
         }
 
@@ -146,6 +152,10 @@ class QuizResultResponse(BaseModel):
     feedback: List[QuestionFeedback]
     submitted_at: datetime
 
+    @field_serializer("submitted_at")
+    def _serialize_datetimes(self, value: Optional[datetime]) -> Optional[int]:
+        return epoch_ms(value)
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -161,7 +171,7 @@ class QuizResultResponse(BaseModel):
                 "passed": True,
                 "time_taken_seconds": 1200,
                 "feedback": [],
-                "submitted_at": "2024-01-15T15:00:00Z"
+                "submitted_at": 1705330800000
             }
         }
 
@@ -177,6 +187,10 @@ class QuizAttemptSummary(BaseModel):
     submitted_at: datetime
     time_taken_seconds: Optional[int]
 
+    @field_serializer("submitted_at")
+    def _serialize_datetimes(self, value: Optional[datetime]) -> Optional[int]:
+        return epoch_ms(value)
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -184,7 +198,7 @@ class QuizAttemptSummary(BaseModel):
                 "attempt_number": 1,
                 "score": 85,
                 "passed": True,
-                "submitted_at": "2024-01-15T15:00:00Z",
+                "submitted_at": 1705330800000,
                 "time_taken_seconds": 1200
             }
         }
@@ -3,6 +3,8 @@ Pytest configuration and fixtures for Course Companion FTE
 Defines reusable fixtures for unit and integration tests
 """
 import asyncio
+import sys
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -11,12 +13,31 @@ from httpx import AsyncClient
 import tempfile
 import os
 
-from backend.main import app
 from backend.core.config import get_settings
 from backend.db.base import Base
 from backend.db.session import get_db_session, db_manager
 
 
+# Use uvloop for the whole test session where available (2-4x faster for
+# the HTTP-heavy AsyncClient traffic these fixtures drive). pytest-asyncio
+# provides scoped event loops itself, so no manual event_loop fixture.
+if sys.platform != "win32":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
+
+# Import the FastAPI app lazily, once per session (and per xdist worker).
+# Importing backend.main constructs every route and Pydantic model, which
+# is too expensive to pay at conftest collection time.
+@pytest.fixture(scope="session")
+def app():
+    from backend.main import app as fastapi_app
+    return fastapi_app
+
+
 # Override the database URL for testing
 @pytest.fixture(scope="session")
 def db_url():
@@ -24,23 +45,59 @@ def db_url():
     return "sqlite+aiosqlite:///:memory:"
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
-
-
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database(db_url):
-    # Temporarily override the database URL for testing
-    original_url = get_settings().DATABASE_URL
-    get_settings().DATABASE_URL = db_url
+    # Temporarily override the database URL for testing.
+    # Settings is frozen, so bypass pydantic's __setattr__ for the override.
+    settings = get_settings()
+    original_url = settings.DATABASE_URL
+    original_env = settings.ENVIRONMENT
+    object.__setattr__(settings, "DATABASE_URL", db_url)
+    # "test" also arms the lazy-load guard in db.session
+    object.__setattr__(settings, "ENVIRONMENT", "test")
 
     yield
 
-    # Restore original URL after tests
-    get_settings().DATABASE_URL = original_url
+    # Restore original settings after tests
+    object.__setattr__(settings, "DATABASE_URL", original_url)
+    object.__setattr__(settings, "ENVIRONMENT", original_env)
+
+
+@pytest.fixture
+def assert_query_count(async_engine):
+    """
+    Context manager asserting a block stays within a SQL query budget.
+
+    Usage:
+        with assert_query_count(5):
+            await client.get(...)
+
+    Catches N+1 regressions: a route that starts lazily walking
+    relationships blows its budget and fails loudly here.
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _budget(max_queries: int):
+        counted = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            counted.append(statement)
+
+        sync_engine = async_engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", _count)
+        try:
+            yield counted
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", _count)
+
+        assert len(counted) <= max_queries, (
+            f"Query budget exceeded: {len(counted)} > {max_queries}\n"
+            + "\n".join(counted)
+        )
+
+    return _budget
 
 
 @pytest.fixture(scope="session")
@@ -70,7 +127,7 @@ async def async_session(async_engine, tables):
 
 
 @pytest.fixture
-async def client(async_session):
+async def client(app, async_session):
     """
     Test client fixture that overrides the database session dependency
     """
@@ -87,7 +144,7 @@ async def client(async_session):
 
 
 @pytest.fixture
-def test_client(async_session):
+def test_client(app, async_session):
     """
     Synchronous test client using TestClient (for FastAPI's default test client)
     """
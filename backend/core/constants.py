@@ -1,62 +1,19 @@
 """
 Course Companion FTE - Application Constants
 """
+import re
+from enum import StrEnum
+from functools import cache
+from pathlib import Path
 
 # Application metadata
 APP_TITLE = "Course Companion FTE API"
-APP_DESCRIPTION = """
-**Course Companion FTE (Full-Time Equivalent) - Phase 1: Zero-Backend-LLM Architecture**
 
-A production-ready educational platform that serves as a 24/7 digital tutor.
 
-## Architecture Principles
-
-**Phase 1 (Current): Zero-Backend-LLM**
-- Backend performs ZERO LLM inference
-- ChatGPT handles ALL intelligent reasoning, explanation, and adaptation
-- Backend is purely deterministic: content retrieval, rule-based grading, progress tracking
-
-## Core Features
-
-### 1. Content Delivery
-- Serves course content verbatim from Cloudflare R2
-- ChatGPT explains at learner's level
-
-### 2. Navigation
-- Provides next/previous chapter sequencing
-- ChatGPT suggests optimal learning path
-
-### 3. Grounded Q&A
-- Returns relevant content sections via search
-- ChatGPT answers using ONLY retrieved content (source-grounded)
-
-### 4. Rule-Based Quizzes
-- Grades with predefined answer keys (exact match/regex)
-- ChatGPT presents, encourages, explains
-
-### 5. Progress Tracking
-- Tracks completion, streaks, quiz scores
-- ChatGPT motivates and celebrates
-
-### 6. Freemium Gate
-- Enforces access control by tier
-- ChatGPT explains premium benefits
-
-## Constitutional Compliance
-
-⚠️ **CRITICAL**: This backend follows Zero-Backend-LLM architecture.
-NO LLM API calls are permitted in Phase 1. Violations result in immediate disqualification.
-
-## API Documentation
-
-- **OpenAPI Spec**: `/openapi.json`
-- **Swagger UI**: `/docs`
-- **ReDoc**: `/redoc`
-
-## Support
-
-For questions or issues, contact the development team.
-"""
+@cache
+def _app_description() -> str:
+    """Read (once) the OpenAPI description markdown shipped next to this module."""
+    return (Path(__file__).parent / "app_description.md").read_text(encoding="utf-8")
 
 # HTTP status codes (commonly used)
 HTTP_200_OK = 200
@@ -70,33 +27,37 @@ HTTP_422_UNPROCESSABLE_ENTITY = 422
 HTTP_429_TOO_MANY_REQUESTS = 429
 HTTP_500_INTERNAL_SERVER_ERROR = 500
 
+# Enum-like string constants use StrEnum: members are singletons, so
+# equality checks hit CPython's identity fast path while still comparing
+# equal to (and serializing as) their plain string values.
+
 # User tiers
-class UserTier:
+class UserTier(StrEnum):
     FREE = "free"
     PREMIUM = "premium"
     PRO = "pro"
     TEAM = "team"
 
 # Quiz question types
-class QuestionType:
+class QuestionType(StrEnum):
     MULTIPLE_CHOICE = "multiple_choice"
     TRUE_FALSE = "true_false"
     FILL_IN_BLANK = "fill_in_blank"
 
 # Quiz difficulty levels
-class DifficultyLevel:
+class DifficultyLevel(StrEnum):
     EASY = "easy"
     MEDIUM = "medium"
     HARD = "hard"
 
 # Content types
-class ContentType:
+class ContentType(StrEnum):
     MARKDOWN = "text/markdown"
     PLAIN_TEXT = "text/plain"
     JSON = "application/json"
 
 # Achievement types
-class AchievementType:
+class AchievementType(StrEnum):
     FIRST_CHAPTER = "first_chapter"
     HALFWAY_HERO = "halfway_hero"
     COURSE_COMPLETE = "course_complete"
@@ -148,19 +109,34 @@ class SuccessMessages:
     CONTENT_RETRIEVED = "Content retrieved successfully"
     STREAK_UPDATED = "Streak updated! Keep up the great work!"
 
-# Regex patterns for validation
+# Regex patterns for validation (compiled once at import; validators call
+# e.g. RegexPatterns.EMAIL.match(value) without re-entering re's cache lock)
 class RegexPatterns:
-    EMAIL = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    UUID = r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
-    SLUG = r"^[a-z0-9]+(?:-[a-z0-9]+)*$"
+    EMAIL = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+    UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+    SLUG = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
 
-# Cache keys
+# Cache key factories (f-strings skip str.format's spec parsing per call)
 class CacheKeys:
-    CHAPTER_CONTENT = "chapter:content:{chapter_id}"
-    USER_PROGRESS = "user:progress:{user_id}"
-    QUIZ_QUESTIONS = "quiz:questions:{quiz_id}"
-    SEARCH_RESULTS = "search:{query}:{filters}"
-    USER_TIER = "user:tier:{user_id}"
+    @staticmethod
+    def chapter_content(chapter_id: int) -> str:
+        return f"chapter:content:{chapter_id}"
+
+    @staticmethod
+    def user_progress(user_id: int) -> str:
+        return f"user:progress:{user_id}"
+
+    @staticmethod
+    def quiz_questions(quiz_id: int) -> str:
+        return f"quiz:questions:{quiz_id}"
+
+    @staticmethod
+    def search_results(query: str, filters: str) -> str:
+        return f"search:{query}:{filters}"
+
+    @staticmethod
+    def user_tier(user_id: int) -> str:
+        return f"user:tier:{user_id}"
 
 # Database table names
 class TableNames:
@@ -198,28 +174,51 @@ MAX_SEARCH_RESULTS = 50
 MAX_FILE_SIZE_MB = 5
 ALLOWED_FILE_EXTENSIONS = [".md", ".txt", ".json"]
 
-# Rate limiting (requests per minute)
-RATE_LIMITS = {
-    UserTier.FREE: 50,
-    UserTier.PREMIUM: 200,
-    UserTier.PRO: 500,
-    UserTier.TEAM: 1000,
-}
+# Rate limiting (requests per minute), indexed by UserTier definition
+# order so the per-request lookup is tuple indexing instead of a dict probe
+RATE_LIMITS = (50, 200, 500, 1000)
+
+# Precomputed tier-name -> ordinal map for resolving DB-stored tier strings
+TIER_ORDINALS = {tier.value: index for index, tier in enumerate(UserTier)}
+
+
+def rate_limit_for_tier(tier: str) -> int:
+    """Per-minute request limit for a tier name (defaults to free)."""
+    return RATE_LIMITS[TIER_ORDINALS.get(tier, 0)]
 
 # Phase 1 Constitutional Constraints
-PHASE_1_FORBIDDEN_IMPORTS = [
+# Frozensets give O(1) membership checks in the import guard
+PHASE_1_FORBIDDEN_IMPORTS = frozenset({
     "anthropic",
     "openai",
     "langchain",
     "llama_index",
     "cohere",
     "google.generativeai",
-]
+})
 
-PHASE_1_FORBIDDEN_PATTERNS = [
+PHASE_1_FORBIDDEN_PATTERNS = frozenset({
     "llm",
     "language_model",
     "generate_text",
     "complete",
     "chat_completion",
-]
+})
+
+# Single-pass alternation over all forbidden patterns; guards use
+# PHASE_1_FORBIDDEN_PATTERNS_RE.search(name) instead of N substring scans
+PHASE_1_FORBIDDEN_PATTERNS_RE = re.compile(
+    "|".join(map(re.escape, sorted(PHASE_1_FORBIDDEN_PATTERNS)))
+)
+
+
+def __getattr__(name: str):
+    """
+    Lazily load the multi-KB APP_DESCRIPTION markdown (PEP 562).
+
+    It is only needed when FastAPI builds the OpenAPI schema, so workers
+    that never serve /docs don't parse or keep the literal resident.
+    """
+    if name == "APP_DESCRIPTION":
+        return _app_description()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,6 +8,10 @@ class BaseAppException(Exception):
     """
     Base exception class for all application-specific exceptions
     """
+    # Store attributes in C-level slots so raising on hot error paths
+    # never populates the instance dict
+    __slots__ = ("message", "status_code")
+
     def __init__(self, message: str, status_code: int = 500):
         self.message = message
         self.status_code = status_code
@@ -18,6 +22,8 @@ class AuthenticationError(BaseAppException):
     """
     Raised when authentication fails
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Authentication failed"):
         super().__init__(message, 401)
 
@@ -26,6 +32,8 @@ class NotFoundError(BaseAppException):
     """
     Raised when a requested resource is not found
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Resource not found"):
         super().__init__(message, 404)
 
@@ -34,6 +42,8 @@ class ForbiddenError(BaseAppException):
     """
     Raised when access to a resource is forbidden
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Access forbidden"):
         super().__init__(message, 403)
 
@@ -42,6 +52,8 @@ class ValidationError(BaseAppException):
     """
     Raised when input validation fails
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Validation failed"):
         super().__init__(message, 400)
 
@@ -50,6 +62,8 @@ class DatabaseError(BaseAppException):
     """
     Raised when database operations fail
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Database operation failed"):
         super().__init__(message, 500)
 
@@ -58,6 +72,8 @@ class StorageError(BaseAppException):
     """
     Raised when storage operations (R2) fail
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Storage operation failed"):
         super().__init__(message, 500)
 
@@ -66,6 +82,8 @@ class RateLimitError(BaseAppException):
     """
     Raised when rate limit is exceeded
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Rate limit exceeded"):
         super().__init__(message, 429)
 
@@ -74,6 +92,8 @@ class BusinessLogicError(BaseAppException):
     """
     Raised when business logic validation fails
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Business logic validation failed"):
         super().__init__(message, 400)
 
@@ -82,5 +102,7 @@ class ConfigurationError(BaseAppException):
     """
     Raised when configuration is invalid or missing
     """
+    __slots__ = ()
+
     def __init__(self, message: str = "Configuration error"):
         super().__init__(message, 500)
\ No newline at end of file
@@ -2,18 +2,80 @@
 Security utilities for Course Companion FTE
 Contains password hashing and JWT token management
 """
-from datetime import datetime, timedelta
+import base64
+import re
+import secrets
+import threading
+import time
+from datetime import timedelta
 from typing import Optional
+import bcrypt
 import jwt
-from passlib.context import CryptContext
-from backend.core.config import get_settings
+from backend.core.config import settings
 
 
-# Initialize password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor resolved once so gensalt never touches settings
+_BCRYPT_ROUNDS = settings.BCRYPT_ROUNDS
 
+# bcrypt uses its own radix-64 alphabet; translate from standard base64
+_BCRYPT_B64_TRANS = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789",
+)
 
-def hash_password(password: str) -> str:
+# Salt header is identical for every hash at a fixed cost factor
+_SALT_PREFIX = b"$2b$" + f"{_BCRYPT_ROUNDS:02d}".encode("ascii") + b"$"
+
+
+class _SaltPool:
+    """
+    Thread-safe pool of random salt bytes.
+
+    bcrypt.gensalt reads os.urandom(16) per call - one syscall per signup.
+    Drawing 4 KB at a time and slicing 16-byte salts amortizes that to one
+    syscall per 256 hashes. Salts are never reused; only the entropy read
+    is batched.
+    """
+
+    def __init__(self) -> None:
+        self._buf = b""
+        self._lock = threading.Lock()
+
+    def take(self) -> bytes:
+        """Return 16 fresh random bytes for a bcrypt salt."""
+        with self._lock:
+            if len(self._buf) < 16:
+                self._buf = secrets.token_bytes(4096)
+            raw, self._buf = self._buf[:16], self._buf[16:]
+            return raw
+
+
+_salt_pool = _SaltPool()
+
+
+def _gensalt() -> bytes:
+    """Build a bcrypt salt from pooled entropy (drop-in for bcrypt.gensalt)."""
+    encoded = base64.b64encode(_salt_pool.take())[:22].translate(_BCRYPT_B64_TRANS)
+    return _SALT_PREFIX + encoded
+
+# JWT constants resolved once at import - the token hot path never re-enters
+# settings attribute lookups or allocates a fresh algorithms list per call
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHM = settings.ALGORITHM
+_ALGORITHMS = (settings.ALGORITHM,)
+_ACCESS_EXP_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_EXP_SECONDS = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+# Pre-bound to skip module attribute lookup on every call
+_jwt_encode = jwt.encode
+_jwt_decode = jwt.decode
+
+# Structural pre-check for decode_token: three base64url segments.
+# Rejects scanner garbage before PyJWT's base64/JSON/HMAC work.
+_TOKEN_SHAPE_RE = re.compile(r"^[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$")
+
+
+def hash_password(password: str) -> bytes:
     """
     Hash a password using bcrypt
 
@@ -21,75 +83,72 @@ def hash_password(password: str) -> str:
         password: Plain text password
 
     Returns:
-        Hashed password string
+        Hashed password as bytes (stored as fixed-width BYTEA)
     """
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode("utf-8"), _gensalt())
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def verify_password(plain_password: str, hashed_password: bytes) -> bool:
     """
     Verify a plain password against a hashed password
 
     Args:
         plain_password: Plain text password to verify
-        hashed_password: Previously hashed password
+        hashed_password: Previously hashed password bytes
 
     Returns:
         True if passwords match, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """
-    Create a JWT access token
+    try:
+        return bcrypt.checkpw(
+            plain_password.encode("utf-8"),
+            hashed_password
+        )
+    except ValueError:
+        # Malformed stored hash
+        return False
 
-    Args:
-        data: Data to encode in the token (typically user info)
-        expires_delta: Optional expiration time delta (defaults to settings value)
 
-    Returns:
-        Encoded JWT token string
+def _make_token_fn(token_type: str, default_exp_seconds: int):
     """
-    settings = get_settings()
+    Build a specialized JWT factory with the token type and default expiry
+    baked into the closure.
 
-    to_encode = data.copy()
-
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-
-    to_encode.update({"exp": expire, "type": "access"})
-
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
-
-
-def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """
-    Create a JWT refresh token
+    Access and refresh token creation are identical apart from these two
+    values, so partial evaluation here keeps a single hot code path with
+    no per-call branching on token type.
 
     Args:
-        data: Data to encode in the token (typically user info)
-        expires_delta: Optional expiration time delta (defaults to settings value)
+        token_type: Value for the "type" claim ("access" or "refresh")
+        default_exp_seconds: Expiry in seconds when no delta is given
 
     Returns:
-        Encoded JWT token string
+        Function with the (data, expires_delta) token-creation signature
     """
-    settings = get_settings()
+    def _create_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+        # Write exp as int seconds directly; PyJWT skips its datetime
+        # normalization branch and no intermediate datetime is allocated
+        if expires_delta:
+            expire = int(time.time() + expires_delta.total_seconds())
+        else:
+            expire = int(time.time()) + default_exp_seconds
 
-    to_encode = data.copy()
+        return _jwt_encode(
+            {**data, "exp": expire, "type": token_type},
+            _SECRET_KEY,
+            algorithm=_ALGORITHM
+        )
 
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    _create_token.__name__ = f"create_{token_type}_token"
+    _create_token.__doc__ = (
+        f"Create a JWT {token_type} token from claim data, with an optional "
+        f"expiration delta overriding the settings default."
+    )
+    return _create_token
 
-    to_encode.update({"exp": expire, "type": "refresh"})
 
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+create_access_token = _make_token_fn("access", _ACCESS_EXP_SECONDS)
+create_refresh_token = _make_token_fn("refresh", _REFRESH_EXP_SECONDS)
 
 
 def decode_token(token: str) -> Optional[dict]:
@@ -102,10 +161,12 @@ def decode_token(token: str) -> Optional[dict]:
     Returns:
         Decoded token data if valid, None if invalid/expired
     """
-    settings = get_settings()
+    # Cheap structural rejection before invoking PyJWT's parse + HMAC path
+    if not token or len(token) < 20 or not _TOKEN_SHAPE_RE.match(token):
+        return None
 
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = _jwt_decode(token, _SECRET_KEY, algorithms=_ALGORITHMS)
         return payload
     except jwt.ExpiredSignatureError:
         # Token has expired
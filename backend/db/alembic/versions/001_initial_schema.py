@@ -5,6 +5,7 @@ Revises:
 Create Date: 2023-01-01 00:00:00.000000
 
 """
+from contextlib import nullcontext
 from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
@@ -17,201 +18,310 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+def _batch():
+    """
+    Commit each table-plus-indexes group independently.
+
+    On PostgreSQL this uses an autocommit block so a failure midway leaves
+    the already-built tables in place instead of rolling back the whole
+    migration; re-running resumes from the failed batch. Other dialects
+    keep the single-transaction behaviour.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def _create_index(name: str, table: str, *columns: str) -> None:
+    """
+    Create an index without blocking writes.
+
+    On PostgreSQL, plain CREATE INDEX takes a lock that blocks writes for
+    the duration of the build, so emit CREATE INDEX CONCURRENTLY inside an
+    autocommit block (CONCURRENTLY cannot run in a transaction). Other
+    dialects (sqlite in tests) fall back to the regular op.create_index.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({', '.join(columns)})"
+            )
+    else:
+        op.create_index(name, table, list(columns))
+
+
+def _drop_index(name: str, table: str) -> None:
+    """Drop an index, using DROP INDEX CONCURRENTLY on PostgreSQL."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    else:
+        op.drop_index(name, table_name=table)
+
+
+# All foreign keys in the schema: (table, constraint, column, ref_table).
+# On PostgreSQL these are added after table creation as NOT VALID (no full
+# scan, weaker lock) and validated in a separate online step; on other
+# dialects they are created inline via _inline_fks.
+_FOREIGN_KEYS = (
+    ('chapters', 'fk_chapters_course_id', 'course_id', 'courses'),
+    ('chapters', 'fk_chapters_previous_chapter_id', 'previous_chapter_id', 'chapters'),
+    ('chapters', 'fk_chapters_next_chapter_id', 'next_chapter_id', 'chapters'),
+    ('quizzes', 'fk_quizzes_chapter_id', 'chapter_id', 'chapters'),
+    ('questions', 'fk_questions_quiz_id', 'quiz_id', 'quizzes'),
+    ('quiz_attempts', 'fk_quiz_attempts_user_id', 'user_id', 'users'),
+    ('quiz_attempts', 'fk_quiz_attempts_quiz_id', 'quiz_id', 'quizzes'),
+    ('progress', 'fk_progress_user_id', 'user_id', 'users'),
+    ('progress', 'fk_progress_chapter_id', 'chapter_id', 'chapters'),
+    ('achievements', 'fk_achievements_user_id', 'user_id', 'users'),
+    ('achievements', 'fk_achievements_context_course_id', 'context_course_id', 'courses'),
+    ('achievements', 'fk_achievements_context_chapter_id', 'context_chapter_id', 'chapters'),
+    ('achievements', 'fk_achievements_context_quiz_id', 'context_quiz_id', 'quizzes'),
+)
+
+
+def _inline_fks(table: str):
+    """
+    Inline ForeignKeyConstraints for a table on non-PostgreSQL dialects.
+
+    PostgreSQL gets its constraints from _add_foreign_keys() instead, so
+    this returns nothing there.
+    """
+    if op.get_bind().dialect.name == 'postgresql':
+        return ()
+    return tuple(
+        sa.ForeignKeyConstraint([column], [f'{ref_table}.id'])
+        for tbl, _name, column, ref_table in _FOREIGN_KEYS
+        if tbl == table
+    )
+
+
+def _add_foreign_keys() -> None:
+    """
+    Add every FK as NOT VALID, then VALIDATE each one separately.
+
+    ADD CONSTRAINT ... NOT VALID skips the existing-row scan and takes a
+    weaker lock; VALIDATE CONSTRAINT then checks rows online in its own
+    autocommit statement, splitting one compute+lock spike into two
+    smaller ones.
+    """
+    for table, name, column, ref_table in _FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} "
+            f"FOREIGN KEY ({column}) REFERENCES {ref_table} (id) NOT VALID"
+        )
+    with op.get_context().autocommit_block():
+        for table, name, _column, _ref_table in _FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
 def upgrade() -> None:
+    # Fail fast instead of queueing behind long-held locks, and cap any
+    # single DDL statement so a stuck build aborts rather than hanging
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("SET lock_timeout = '5s'")
+        op.execute("SET statement_timeout = '10min'")
+
     # Create users table
-    op.create_table('users',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('email', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
-        sa.Column('hashed_password', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
-        sa.Column('tier', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='free'),
-        sa.Column('tier_expires_at', sa.DateTime(), nullable=True),
-        sa.Column('timezone', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False, server_default='UTC'),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.text('TRUE')),
-        sa.Column('is_verified', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('email')
-    )
-    op.create_index('ix_users_email', 'users', ['email'])
+    with _batch():
+        op.create_table('users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('email', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+            sa.Column('hashed_password', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+            sa.Column('tier', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='free'),
+            sa.Column('tier_expires_at', sa.DateTime(), nullable=True),
+            sa.Column('timezone', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False, server_default='UTC'),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.text('TRUE')),
+            sa.Column('is_verified', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+        _create_index('ix_users_email', 'users', 'email')
 
     # Create courses table
-    op.create_table('courses',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('slug', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
-        sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
-        sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=False),
-        sa.Column('free_chapter_limit', sa.Integer(), nullable=False, server_default='3'),
-        sa.Column('required_tier', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='free'),
-        sa.Column('total_chapters', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('estimated_hours', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('difficulty_level', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='intermediate'),
-        sa.Column('is_published', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.Column('published_at', sa.DateTime(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('slug')
-    )
-    op.create_index('ix_courses_slug', 'courses', ['slug'])
+    with _batch():
+        op.create_table('courses',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('slug', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+            sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+            sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=False),
+            sa.Column('free_chapter_limit', sa.Integer(), nullable=False, server_default='3'),
+            sa.Column('required_tier', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='free'),
+            sa.Column('total_chapters', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('estimated_hours', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('difficulty_level', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='intermediate'),
+            sa.Column('is_published', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            sa.Column('published_at', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('slug')
+        )
+        _create_index('ix_courses_slug', 'courses', 'slug')
 
     # Create chapters table
-    op.create_table('chapters',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('course_id', sa.Integer(), nullable=False),
-        sa.Column('chapter_number', sa.Integer(), nullable=False),
-        sa.Column('slug', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
-        sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
-        sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
-        sa.Column('content_key', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
-        sa.Column('previous_chapter_id', sa.Integer(), nullable=True),
-        sa.Column('next_chapter_id', sa.Integer(), nullable=True),
-        sa.Column('estimated_minutes', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('word_count', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('requires_premium', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.Column('embedding', sa.Text(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('is_published', sa.Boolean(), nullable=False, server_default=sa.text('TRUE')),
-        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
-        sa.ForeignKeyConstraint(['previous_chapter_id'], ['chapters.id']),
-        sa.ForeignKeyConstraint(['next_chapter_id'], ['chapters.id']),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index('ix_chapters_course_id', 'chapters', ['course_id'])
-    op.create_index('ix_chapters_slug', 'chapters', ['slug'])
+    with _batch():
+        op.create_table('chapters',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('course_id', sa.Integer(), nullable=False),
+            sa.Column('chapter_number', sa.Integer(), nullable=False),
+            sa.Column('slug', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+            sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+            sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
+            sa.Column('content_key', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+            sa.Column('previous_chapter_id', sa.Integer(), nullable=True),
+            sa.Column('next_chapter_id', sa.Integer(), nullable=True),
+            sa.Column('estimated_minutes', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('word_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('requires_premium', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            sa.Column('embedding', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('is_published', sa.Boolean(), nullable=False, server_default=sa.text('TRUE')),
+            *_inline_fks('chapters'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        _create_index('ix_chapters_course_id', 'chapters', 'course_id')
+        _create_index('ix_chapters_slug', 'chapters', 'slug')
 
     # Create quizzes table
-    op.create_table('quizzes',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('chapter_id', sa.Integer(), nullable=False),
-        sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
-        sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
-        sa.Column('difficulty', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='medium'),
-        sa.Column('passing_score', sa.Integer(), nullable=False, server_default='70'),
-        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'),
-        sa.Column('time_limit_minutes', sa.Integer(), nullable=True),
-        sa.Column('requires_premium', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('is_published', sa.Boolean(), nullable=False, server_default=sa.text('TRUE')),
-        sa.ForeignKeyConstraint(['chapter_id'], ['chapters.id']),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index('ix_quizzes_chapter_id', 'quizzes', ['chapter_id'])
+    with _batch():
+        op.create_table('quizzes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('chapter_id', sa.Integer(), nullable=False),
+            sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+            sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
+            sa.Column('difficulty', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='medium'),
+            sa.Column('passing_score', sa.Integer(), nullable=False, server_default='70'),
+            sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'),
+            sa.Column('time_limit_minutes', sa.Integer(), nullable=True),
+            sa.Column('requires_premium', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('is_published', sa.Boolean(), nullable=False, server_default=sa.text('TRUE')),
+            *_inline_fks('quizzes'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        _create_index('ix_quizzes_chapter_id', 'quizzes', 'chapter_id')
 
     # Create questions table
-    op.create_table('questions',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('quiz_id', sa.Integer(), nullable=False),
-        sa.Column('question_number', sa.Integer(), nullable=False),
-        sa.Column('question_text', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=False),
-        sa.Column('question_type', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
-        sa.Column('answer_config', sa.Text(), nullable=False),
-        sa.Column('case_sensitive', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.Column('trim_whitespace', sa.Boolean(), nullable=False, server_default=sa.text('TRUE')),
-        sa.Column('allow_partial', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.Column('points', sa.Integer(), nullable=False, server_default='1'),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id']),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index('ix_questions_quiz_id', 'questions', ['quiz_id'])
+    with _batch():
+        op.create_table('questions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('quiz_id', sa.Integer(), nullable=False),
+            sa.Column('question_number', sa.Integer(), nullable=False),
+            sa.Column('question_text', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=False),
+            sa.Column('question_type', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+            sa.Column('answer_config', sa.Text(), nullable=False),
+            sa.Column('case_sensitive', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            sa.Column('trim_whitespace', sa.Boolean(), nullable=False, server_default=sa.text('TRUE')),
+            sa.Column('allow_partial', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            sa.Column('points', sa.Integer(), nullable=False, server_default='1'),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            *_inline_fks('questions'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        _create_index('ix_questions_quiz_id', 'questions', 'quiz_id')
 
     # Create quiz_attempts table
-    op.create_table('quiz_attempts',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('quiz_id', sa.Integer(), nullable=False),
-        sa.Column('attempt_number', sa.Integer(), nullable=False),
-        sa.Column('answers', sa.Text(), nullable=False),
-        sa.Column('score', sa.Integer(), nullable=False),
-        sa.Column('correct_count', sa.Integer(), nullable=False),
-        sa.Column('total_questions', sa.Integer(), nullable=False),
-        sa.Column('passed', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.Column('started_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('submitted_at', sa.DateTime(), nullable=True),
-        sa.Column('time_taken_seconds', sa.Integer(), nullable=True),
-        sa.Column('feedback', sa.Text(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
-        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id']),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index('ix_quiz_attempts_user_id', 'quiz_attempts', ['user_id'])
-    op.create_index('ix_quiz_attempts_quiz_id', 'quiz_attempts', ['quiz_id'])
+    with _batch():
+        op.create_table('quiz_attempts',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('quiz_id', sa.Integer(), nullable=False),
+            sa.Column('attempt_number', sa.Integer(), nullable=False),
+            sa.Column('answers', sa.Text(), nullable=False),
+            sa.Column('score', sa.Integer(), nullable=False),
+            sa.Column('correct_count', sa.Integer(), nullable=False),
+            sa.Column('total_questions', sa.Integer(), nullable=False),
+            sa.Column('passed', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            sa.Column('started_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('submitted_at', sa.DateTime(), nullable=True),
+            sa.Column('time_taken_seconds', sa.Integer(), nullable=True),
+            sa.Column('feedback', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            *_inline_fks('quiz_attempts'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        _create_index('ix_quiz_attempts_user_id', 'quiz_attempts', 'user_id')
+        _create_index('ix_quiz_attempts_quiz_id', 'quiz_attempts', 'quiz_id')
 
     # Create progress table
-    op.create_table('progress',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('chapter_id', sa.Integer(), nullable=False),
-        sa.Column('is_completed', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.Column('completed_at', sa.DateTime(), nullable=True),
-        sa.Column('time_spent_seconds', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('last_position', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('last_accessed_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('last_activity_date', sa.DateTime(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
-        sa.ForeignKeyConstraint(['chapter_id'], ['chapters.id']),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index('ix_progress_user_id', 'progress', ['user_id'])
-    op.create_index('ix_progress_chapter_id', 'progress', ['chapter_id'])
+    with _batch():
+        op.create_table('progress',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('chapter_id', sa.Integer(), nullable=False),
+            sa.Column('is_completed', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.Column('time_spent_seconds', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('last_position', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('last_accessed_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('last_activity_date', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            *_inline_fks('progress'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        _create_index('ix_progress_user_id', 'progress', 'user_id')
+        _create_index('ix_progress_chapter_id', 'progress', 'chapter_id')
 
     # Create achievements table
-    op.create_table('achievements',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('achievement_type', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
-        sa.Column('achievement_name', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
-        sa.Column('achievement_description', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
-        sa.Column('context_course_id', sa.Integer(), nullable=True),
-        sa.Column('context_chapter_id', sa.Integer(), nullable=True),
-        sa.Column('context_quiz_id', sa.Integer(), nullable=True),
-        sa.Column('earned_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
-        sa.Column('is_notified', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
-        sa.ForeignKeyConstraint(['context_course_id'], ['courses.id']),
-        sa.ForeignKeyConstraint(['context_chapter_id'], ['chapters.id']),
-        sa.ForeignKeyConstraint(['context_quiz_id'], ['quizzes.id']),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index('ix_achievements_user_id', 'achievements', ['user_id'])
-    op.create_index('ix_achievements_achievement_type', 'achievements', ['achievement_type'])
+    with _batch():
+        op.create_table('achievements',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('achievement_type', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+            sa.Column('achievement_name', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+            sa.Column('achievement_description', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+            sa.Column('context_course_id', sa.Integer(), nullable=True),
+            sa.Column('context_chapter_id', sa.Integer(), nullable=True),
+            sa.Column('context_quiz_id', sa.Integer(), nullable=True),
+            sa.Column('earned_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('is_notified', sa.Boolean(), nullable=False, server_default=sa.text('FALSE')),
+            *_inline_fks('achievements'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        _create_index('ix_achievements_user_id', 'achievements', 'user_id')
+        _create_index('ix_achievements_achievement_type', 'achievements', 'achievement_type')
+
+    # Add FK constraints last: NOT VALID first, then online validation
+    if op.get_bind().dialect.name == 'postgresql':
+        _add_foreign_keys()
 
 
 def downgrade() -> None:
     # Drop tables in reverse order (reverse of creation)
-    op.drop_index('ix_achievements_achievement_type', table_name='achievements')
-    op.drop_index('ix_achievements_user_id', table_name='achievements')
+    _drop_index('ix_achievements_achievement_type', 'achievements')
+    _drop_index('ix_achievements_user_id', 'achievements')
     op.drop_table('achievements')
 
-    op.drop_index('ix_progress_chapter_id', table_name='progress')
-    op.drop_index('ix_progress_user_id', table_name='progress')
+    _drop_index('ix_progress_chapter_id', 'progress')
+    _drop_index('ix_progress_user_id', 'progress')
     op.drop_table('progress')
 
-    op.drop_index('ix_quiz_attempts_quiz_id', table_name='quiz_attempts')
-    op.drop_index('ix_quiz_attempts_user_id', table_name='quiz_attempts')
+    _drop_index('ix_quiz_attempts_quiz_id', 'quiz_attempts')
+    _drop_index('ix_quiz_attempts_user_id', 'quiz_attempts')
     op.drop_table('quiz_attempts')
 
-    op.drop_index('ix_questions_quiz_id', table_name='questions')
+    _drop_index('ix_questions_quiz_id', 'questions')
     op.drop_table('questions')
 
-    op.drop_index('ix_quizzes_chapter_id', table_name='quizzes')
+    _drop_index('ix_quizzes_chapter_id', 'quizzes')
     op.drop_table('quizzes')
 
-    op.drop_index('ix_chapters_slug', table_name='chapters')
-    op.drop_index('ix_chapters_course_id', table_name='chapters')
+    _drop_index('ix_chapters_slug', 'chapters')
+    _drop_index('ix_chapters_course_id', 'chapters')
     op.drop_table('chapters')
 
-    op.drop_index('ix_courses_slug', table_name='courses')
+    _drop_index('ix_courses_slug', 'courses')
     op.drop_table('courses')
 
-    op.drop_index('ix_users_email', table_name='users')
+    _drop_index('ix_users_email', 'users')
     op.drop_table('users')
\ No newline at end of file
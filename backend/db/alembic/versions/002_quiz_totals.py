@@ -0,0 +1,40 @@
+"""Denormalize question totals onto quizzes
+
+Revision ID: 002_quiz_totals
+Revises: 001_initial_schema
+Create Date: 2023-01-02 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002_quiz_totals'
+down_revision: Union[str, None] = '001_initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add denormalized totals maintained by Question insert/delete listeners
+    op.add_column('quizzes', sa.Column('total_points', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('quizzes', sa.Column('total_questions', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from existing questions
+    op.execute(
+        """
+        UPDATE quizzes SET
+            total_points = COALESCE(
+                (SELECT SUM(points) FROM questions WHERE questions.quiz_id = quizzes.id), 0
+            ),
+            total_questions = COALESCE(
+                (SELECT COUNT(*) FROM questions WHERE questions.quiz_id = quizzes.id), 0
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('quizzes', 'total_questions')
+    op.drop_column('quizzes', 'total_points')
@@ -0,0 +1,56 @@
+"""Composite and covering indexes for hot query paths
+
+Revision ID: 003_hot_path_indexes
+Revises: 002_quiz_totals
+Create Date: 2023-01-03 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '003_hot_path_indexes'
+down_revision: Union[str, None] = '002_quiz_totals'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite indexes matching the natural lookup patterns, so the hot
+    # endpoints scan one index range instead of index scan + heap lookup
+    # per row. All are unique: they encode real row identity.
+    #
+    # The INCLUDE columns (PostgreSQL 11+; ignored on sqlite) let the
+    # progress lookup answer completion checks index-only.
+    op.create_index(
+        'ix_progress_user_chapter', 'progress',
+        ['user_id', 'chapter_id'],
+        unique=True,
+        postgresql_include=['is_completed', 'last_position'],
+    )
+    op.create_index(
+        'ix_chapters_course_number', 'chapters',
+        ['course_id', 'chapter_number'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_quiz_attempts_user_quiz_attempt', 'quiz_attempts',
+        ['user_id', 'quiz_id', 'attempt_number'],
+        unique=True,
+    )
+
+    # Single-column FK indexes whose leading column is now covered by a
+    # composite above; keeping them would only slow writes.
+    op.drop_index('ix_progress_user_id', table_name='progress')
+    op.drop_index('ix_chapters_course_id', table_name='chapters')
+    op.drop_index('ix_quiz_attempts_user_id', table_name='quiz_attempts')
+
+
+def downgrade() -> None:
+    op.create_index('ix_quiz_attempts_user_id', 'quiz_attempts', ['user_id'])
+    op.create_index('ix_chapters_course_id', 'chapters', ['course_id'])
+    op.create_index('ix_progress_user_id', 'progress', ['user_id'])
+
+    op.drop_index('ix_quiz_attempts_user_quiz_attempt', table_name='quiz_attempts')
+    op.drop_index('ix_chapters_course_number', table_name='chapters')
+    op.drop_index('ix_progress_user_chapter', table_name='progress')
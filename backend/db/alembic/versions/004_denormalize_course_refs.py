@@ -0,0 +1,76 @@
+"""Denormalize course references onto progress and chapters
+
+Revision ID: 004_denormalize_course_refs
+Revises: 003_hot_path_indexes
+Create Date: 2023-01-04 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '004_denormalize_course_refs'
+down_revision: Union[str, None] = '003_hot_path_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Redundant columns so the dashboard path ("which courses is this user
+    # progressing on?") is a single-table index scan instead of a
+    # progress -> chapters -> courses join.
+    op.add_column('progress', sa.Column('course_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_progress_course_id', 'progress', 'courses', ['course_id'], ['id'])
+    op.add_column('chapters', sa.Column('course_slug', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True))
+
+    # Backfill from the normalized sources
+    op.execute(
+        """
+        UPDATE progress SET course_id = (
+            SELECT course_id FROM chapters WHERE chapters.id = progress.chapter_id
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE chapters SET course_slug = (
+            SELECT slug FROM courses WHERE courses.id = chapters.course_id
+        )
+        """
+    )
+
+    op.create_index('ix_progress_user_course', 'progress', ['user_id', 'course_id'])
+
+    # Keep progress.course_id correct even for writers that bypass the app
+    # layer (the service also sets it on insert)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            """
+            CREATE OR REPLACE FUNCTION sync_progress_course_id() RETURNS trigger AS $$
+            BEGIN
+                SELECT course_id INTO NEW.course_id FROM chapters WHERE id = NEW.chapter_id;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER trg_progress_course_id
+            BEFORE INSERT OR UPDATE OF chapter_id ON progress
+            FOR EACH ROW EXECUTE FUNCTION sync_progress_course_id()
+            """
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS trg_progress_course_id ON progress')
+        op.execute('DROP FUNCTION IF EXISTS sync_progress_course_id()')
+
+    op.drop_index('ix_progress_user_course', table_name='progress')
+    op.drop_column('chapters', 'course_slug')
+    op.drop_constraint('fk_progress_course_id', 'progress', type_='foreignkey')
+    op.drop_column('progress', 'course_id')
@@ -0,0 +1,53 @@
+"""Store chapter embeddings as pgvector with an HNSW index
+
+Revision ID: 005_pgvector_embeddings
+Revises: 004_denormalize_course_refs
+Create Date: 2023-01-05 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '005_pgvector_embeddings'
+down_revision: Union[str, None] = '004_denormalize_course_refs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches the sentence-transformers model used by the offline
+# generate_embeddings pipeline
+EMBEDDING_DIM = 768
+
+
+def upgrade() -> None:
+    # pgvector is PostgreSQL-only; sqlite (tests) keeps the JSON TEXT column
+    # and the Python cosine fallback in SearchService.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    # Existing values are JSON arrays ('[0.1, ...]'), which is also valid
+    # pgvector literal syntax, so a straight cast backfills in place
+    op.execute(
+        f"ALTER TABLE chapters ALTER COLUMN embedding "
+        f"TYPE vector({EMBEDDING_DIM}) USING embedding::vector({EMBEDDING_DIM})"
+    )
+
+    # Approximate nearest-neighbour index; built concurrently so chapter
+    # writes keep flowing during the (potentially long) HNSW build
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chapters_embedding_hnsw "
+            "ON chapters USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chapters_embedding_hnsw")
+    op.execute("ALTER TABLE chapters ALTER COLUMN embedding TYPE text USING embedding::text")
@@ -0,0 +1,51 @@
+"""Materialized view for per-user course progress aggregates
+
+Revision ID: 006_course_progress_mv
+Revises: 005_pgvector_embeddings
+Create Date: 2023-01-06 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '006_course_progress_mv'
+down_revision: Union[str, None] = '005_pgvector_embeddings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Materialized views are PostgreSQL-only; sqlite (tests) computes the
+    # aggregates per request as before.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Precomputed "% of chapters completed per course per user" so the
+    # dashboard reads one row instead of aggregating three tables
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW mv_course_progress AS
+        SELECT p.user_id,
+               c.course_id,
+               COUNT(*) FILTER (WHERE p.is_completed) AS completed_chapters,
+               COUNT(*) AS started_chapters,
+               MAX(p.last_accessed_at) AS last_activity
+        FROM progress p
+        JOIN chapters c ON c.id = p.chapter_id
+        GROUP BY p.user_id, c.course_id
+        """
+    )
+
+    # Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute(
+        "CREATE UNIQUE INDEX ix_mv_course_progress_user_course "
+        "ON mv_course_progress (user_id, course_id)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_course_progress")
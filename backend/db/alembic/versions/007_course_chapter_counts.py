@@ -0,0 +1,69 @@
+"""Maintain courses.total_chapters and estimated_hours with triggers
+
+Revision ID: 007_course_chapter_counts
+Revises: 006_course_progress_mv
+Create Date: 2023-01-07 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '007_course_chapter_counts'
+down_revision: Union[str, None] = '006_course_progress_mv'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backfill the denormalized columns from current chapter rows
+    op.execute(
+        """
+        UPDATE courses SET
+            total_chapters = COALESCE(
+                (SELECT COUNT(*) FROM chapters WHERE chapters.course_id = courses.id), 0
+            ),
+            estimated_hours = COALESCE(
+                (SELECT SUM(estimated_minutes) FROM chapters
+                 WHERE chapters.course_id = courses.id), 0
+            ) / 60
+        """
+    )
+
+    # Keep them authoritative on every chapter write, so course pages read
+    # one row instead of re-counting chapters
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            """
+            CREATE OR REPLACE FUNCTION recount_course_chapters() RETURNS trigger AS $$
+            DECLARE
+                target_course_id INTEGER;
+            BEGIN
+                target_course_id := COALESCE(NEW.course_id, OLD.course_id);
+                UPDATE courses SET
+                    total_chapters = (
+                        SELECT COUNT(*) FROM chapters WHERE course_id = target_course_id
+                    ),
+                    estimated_hours = (
+                        SELECT COALESCE(SUM(estimated_minutes), 0) / 60
+                        FROM chapters WHERE course_id = target_course_id
+                    )
+                WHERE id = target_course_id;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER trg_recount_course_chapters
+            AFTER INSERT OR UPDATE OF course_id, estimated_minutes OR DELETE ON chapters
+            FOR EACH ROW EXECUTE FUNCTION recount_course_chapters()
+            """
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS trg_recount_course_chapters ON chapters')
+        op.execute('DROP FUNCTION IF EXISTS recount_course_chapters()')
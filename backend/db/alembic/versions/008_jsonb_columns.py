@@ -0,0 +1,52 @@
+"""Convert JSON TEXT blobs to JSONB
+
+Revision ID: 008_jsonb_columns
+Revises: 007_course_chapter_counts
+Create Date: 2023-01-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '008_jsonb_columns'
+down_revision: Union[str, None] = '007_course_chapter_counts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_JSONB_COLUMNS = (
+    ('questions', 'answer_config'),
+    ('quiz_attempts', 'answers'),
+    ('quiz_attempts', 'feedback'),
+)
+
+
+def upgrade() -> None:
+    # JSONB is parsed once at insert, partially updatable, and queryable;
+    # sqlite (tests) keeps SQLAlchemy's generic JSON handling over TEXT.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column in _JSONB_COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} "
+            f"TYPE jsonb USING {column}::jsonb"
+        )
+
+    # Content-based lookups on answer configs (e.g. by question options)
+    op.execute(
+        "CREATE INDEX ix_questions_answer_gin "
+        "ON questions USING GIN (answer_config jsonb_path_ops)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_questions_answer_gin")
+    for table, column in _JSONB_COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} "
+            f"TYPE text USING {column}::text"
+        )
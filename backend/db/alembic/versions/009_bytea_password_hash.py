@@ -0,0 +1,38 @@
+"""Store password hashes as fixed-width BYTEA
+
+Revision ID: 009_bytea_password_hash
+Revises: 008_jsonb_columns
+Create Date: 2023-01-09 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009_bytea_password_hash'
+down_revision: Union[str, None] = '008_jsonb_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # bcrypt hashes are 60 fixed ASCII bytes; BYTEA narrows the row versus
+    # VARCHAR(255) and skips UTF-8 validation on the auth-hot users table
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "ALTER TABLE users ALTER COLUMN hashed_password "
+            "TYPE bytea USING hashed_password::bytea"
+        )
+    else:
+        op.alter_column('users', 'hashed_password', type_=sa.LargeBinary(60))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "ALTER TABLE users ALTER COLUMN hashed_password "
+            "TYPE varchar(255) USING convert_from(hashed_password, 'UTF8')"
+        )
+    else:
+        op.alter_column('users', 'hashed_password', type_=sa.String(length=255))
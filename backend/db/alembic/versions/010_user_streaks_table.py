@@ -0,0 +1,70 @@
+"""Move streak state to a per-user user_streaks table
+
+Revision ID: 010_user_streaks_table
+Revises: 009_bytea_password_hash
+Create Date: 2023-01-10 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010_user_streaks_table'
+down_revision: Union[str, None] = '009_bytea_password_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Streaks are per-user, not per-chapter; the duplicated columns on
+    # progress forced every streak write to touch every progress row.
+    op.create_table('user_streaks',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_activity_date', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill one row per user from the duplicated progress columns
+    op.execute(
+        """
+        INSERT INTO user_streaks (user_id, current_streak, longest_streak, last_activity_date)
+        SELECT user_id, MAX(current_streak), MAX(longest_streak), MAX(last_activity_date)
+        FROM progress
+        GROUP BY user_id
+        """
+    )
+
+    op.drop_column('progress', 'current_streak')
+    op.drop_column('progress', 'longest_streak')
+    op.drop_column('progress', 'last_activity_date')
+
+
+def downgrade() -> None:
+    op.add_column('progress', sa.Column('last_activity_date', sa.DateTime(), nullable=True))
+    op.add_column('progress', sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('progress', sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'))
+
+    op.execute(
+        """
+        UPDATE progress SET
+            current_streak = COALESCE(
+                (SELECT current_streak FROM user_streaks
+                 WHERE user_streaks.user_id = progress.user_id), 0
+            ),
+            longest_streak = COALESCE(
+                (SELECT longest_streak FROM user_streaks
+                 WHERE user_streaks.user_id = progress.user_id), 0
+            ),
+            last_activity_date = (
+                SELECT last_activity_date FROM user_streaks
+                WHERE user_streaks.user_id = progress.user_id
+            )
+        """
+    )
+
+    op.drop_table('user_streaks')
@@ -0,0 +1,42 @@
+"""Tune fillfactor and autovacuum for update-hot tables
+
+Revision ID: 011_fillfactor_tuning
+Revises: 010_user_streaks_table
+Create Date: 2023-01-11 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011_fillfactor_tuning'
+down_revision: Union[str, None] = '010_user_streaks_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose rows are rewritten in place (last_position, time_spent,
+# login timestamps). fillfactor=80 leaves in-page slack so those UPDATEs
+# stay HOT (no index maintenance, fewer dead tuples), and the lower
+# autovacuum scale factor keeps the slack reclaimed.
+_UPDATE_HOT_TABLES = ('progress', 'quiz_attempts', 'users')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in _UPDATE_HOT_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} SET (fillfactor = 80, autovacuum_vacuum_scale_factor = 0.05)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in _UPDATE_HOT_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} RESET (fillfactor, autovacuum_vacuum_scale_factor)"
+        )
@@ -0,0 +1,54 @@
+"""Partial indexes for skewed boolean filters
+
+Revision ID: 012_partial_boolean_indexes
+Revises: 011_fillfactor_tuning
+Create Date: 2023-01-12 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012_partial_boolean_indexes'
+down_revision: Union[str, None] = '011_fillfactor_tuning'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Boolean columns here are heavily skewed, so a full index is mostly
+# wasted space; a partial index over only the interesting subset stays
+# tiny and enables index-only scans: (name, table, columns, predicate)
+_PARTIAL_INDEXES = (
+    ('ix_courses_published', 'courses', 'id', 'is_published'),
+    ('ix_progress_user_completed', 'progress', 'user_id', 'is_completed'),
+    ('ix_quiz_attempts_passed', 'quiz_attempts', 'user_id, quiz_id', 'passed'),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns, predicate in _PARTIAL_INDEXES:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                    f"ON {table} ({columns}) WHERE {predicate}"
+                )
+    else:
+        for name, table, columns, predicate in _PARTIAL_INDEXES:
+            op.create_index(
+                name, table,
+                [col.strip() for col in columns.split(',')],
+                postgresql_where=sa.text(predicate),
+                sqlite_where=sa.text(predicate),
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, _table, _columns, _predicate in _PARTIAL_INDEXES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    else:
+        for name, table, _columns, _predicate in _PARTIAL_INDEXES:
+            op.drop_index(name, table_name=table)
@@ -2,10 +2,59 @@
 Database session management for Course Companion FTE
 Creates async SQLModel engine and session factory
 """
+import asyncio
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from backend.core.config import get_settings
 
 
+def _normalize_database_url(url: str) -> str:
+    """
+    Force the asyncpg driver for PostgreSQL URLs.
+
+    A bare postgresql:// URL would load the sync psycopg driver; asyncpg
+    speaks the binary protocol with server-side prepared statements, which
+    is much cheaper for the many small OLTP queries this app issues.
+    """
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+_lazy_load_guard_installed = False
+
+
+def install_lazy_load_guard() -> None:
+    """
+    Turn accidental lazy loads into errors (test/dev environments).
+
+    Tags every top-level ORM SELECT with raiseload("*", sql_only=True), so
+    walking an unloaded relationship raises instead of silently emitting an
+    N+1 query. Relationship loads themselves are exempt, which keeps the
+    configured selectin eager loads working.
+    """
+    global _lazy_load_guard_installed
+    if _lazy_load_guard_installed:
+        return
+
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session, raiseload
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _raise_on_lazy_select(execute_state) -> None:
+        if (
+            execute_state.is_select
+            and not execute_state.is_column_load
+            and not execute_state.is_relationship_load
+        ):
+            execute_state.statement = execute_state.statement.options(
+                raiseload("*", sql_only=True)
+            )
+
+    _lazy_load_guard_installed = True
+
+
 class DatabaseSessionManager:
     """
     Manages database sessions and engine lifecycle
@@ -23,15 +72,34 @@ class DatabaseSessionManager:
             return
 
         settings = get_settings()
+        database_url = _normalize_database_url(settings.DATABASE_URL)
+
+        connect_args = {}
+        if database_url.startswith("postgresql+asyncpg://"):
+            # Cache server-side prepared statements so repeated queries skip
+            # parse/plan, and disable JIT - it only hurts short OLTP queries
+            connect_args = {
+                "prepared_statement_cache_size": 512,
+                "statement_cache_size": 512,
+                "server_settings": {
+                    "application_name": "course-companion",
+                    "jit": "off",
+                },
+            }
 
         # Create async engine
         self.engine = create_async_engine(
-            settings.DATABASE_URL,
+            database_url,
             echo=settings.DB_ECHO,
             pool_size=settings.DB_POOL_SIZE,
             max_overflow=settings.DB_MAX_OVERFLOW,
             pool_pre_ping=True,  # Verify connections before use
-            pool_recycle=300,    # Recycle connections every 5 minutes
+            pool_recycle=1800,   # Recycle connections every 30 minutes
+            # LIFO keeps re-handing out the hottest connections, so their
+            # server-side prepared-statement caches stay warm
+            pool_use_lifo=True,
+            query_cache_size=1200,  # SQL compilation cache (default 500)
+            connect_args=connect_args,
         )
 
         # Create async session factory
@@ -42,8 +110,39 @@ class DatabaseSessionManager:
             expire_on_commit=False,
         )
 
+        # Make accidental lazy loads loud failures under test
+        if settings.ENVIRONMENT == "test":
+            install_lazy_load_guard()
+
+        # Bind the finalized factory at module scope so the per-request
+        # dependency below runs branch-free
+        global session_factory
+        session_factory = self.SessionLocal
+
         self._initialized = True
 
+    async def prewarm(self) -> None:
+        """
+        Open DB_POOL_SIZE connections up front.
+
+        Called from lifespan startup so a cold-start burst hits a hot pool
+        instead of each early request paying the TCP/TLS/auth round trip.
+        """
+        if not self._initialized:
+            self.init_db()
+
+        # Acquire all connections concurrently (sequential pings would just
+        # reuse the same pooled connection), verify each, then release
+        connections = await asyncio.gather(
+            *(self.engine.connect() for _ in range(get_settings().DB_POOL_SIZE))
+        )
+        try:
+            await asyncio.gather(
+                *(conn.execute(text("SELECT 1")) for conn in connections)
+            )
+        finally:
+            await asyncio.gather(*(conn.close() for conn in connections))
+
     async def close(self) -> None:
         """
         Close database engine connection
@@ -55,15 +154,19 @@ class DatabaseSessionManager:
 # Global session manager instance
 db_manager = DatabaseSessionManager()
 
+# Populated once by init_db() (called from the application lifespan);
+# referencing it directly keeps the per-request dependency branch-free
+session_factory: async_sessionmaker | None = None
+
 
 async def get_db_session():
     """
-    Dependency to provide database session to FastAPI endpoints
-    """
-    if not db_manager._initialized:
-        db_manager.init_db()
+    Dependency to provide database session to FastAPI endpoints.
 
-    async with db_manager.SessionLocal() as session:
+    Initialization happens in the lifespan, so this runs with no
+    initialized-check on the hot path.
+    """
+    async with session_factory() as session:
         yield session
 
 
@@ -7,17 +7,20 @@ This backend MUST NOT contain any LLM API calls.
 Violations result in immediate disqualification.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import logging
 
-from backend.core.config import settings
+from backend.core.config import get_settings, settings, validate_compliance
 from backend.core.constants import APP_DESCRIPTION, APP_TITLE
+from backend.db.session import db_manager
 # from backend.api.routes import health, content, navigation, quizzes, progress, auth
 # Uncomment above when routes are implemented
 
@@ -29,6 +32,93 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Migration progress exposed via /health ("pending" -> "running" -> "ok"/"failed")
+_migration_status = {"state": "ok"}
+
+# Latest health-probe snapshot, refreshed by _health_loop(). Load balancers
+# poll /health at multi-Hz; serving this cache keeps those polls from each
+# costing a database round trip (or a pool connection during a stampede).
+_HEALTH_PROBE_INTERVAL_SECONDS = 5
+_last_health = {"database": "ok", "replica_role": "unknown"}
+
+
+async def _probe_database() -> None:
+    """
+    Run one health probe against the database and update _last_health.
+    """
+    from sqlalchemy import text
+
+    try:
+        async with db_manager.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            if db_manager.engine.dialect.name == "postgresql":
+                # Detect failover: a promoted replica answers SELECT 1 but
+                # reports its recovery state here
+                result = await conn.execute(text("SELECT pg_is_in_recovery()"))
+                in_recovery = result.scalar()
+                _last_health["replica_role"] = "replica" if in_recovery else "primary"
+            else:
+                _last_health["replica_role"] = "primary"
+        _last_health["database"] = "ok"
+    except Exception:
+        _last_health["database"] = "error"
+        logger.exception("[ERROR] Database health probe failed")
+
+
+async def _health_loop() -> None:
+    """
+    Refresh the /health snapshot every few seconds in the background.
+    """
+    while True:
+        await _probe_database()
+        await asyncio.sleep(_HEALTH_PROBE_INTERVAL_SECONDS)
+
+
+async def _refresh_course_progress_view() -> None:
+    """
+    Periodically refresh the mv_course_progress materialized view.
+
+    CONCURRENTLY keeps the view readable during refresh (requires the
+    unique index from migration 006). No-op on non-PostgreSQL databases.
+    """
+    from sqlalchemy import text
+
+    if db_manager.engine.dialect.name != "postgresql":
+        return
+
+    while True:
+        await asyncio.sleep(settings.PROGRESS_CACHE_TTL)
+        try:
+            async with db_manager.engine.begin() as conn:
+                await conn.execute(
+                    text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_course_progress")
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("[ERROR] mv_course_progress refresh failed")
+
+
+async def run_migrations_async() -> None:
+    """
+    Apply Alembic migrations off the startup path.
+
+    Runs `alembic upgrade head` in a worker thread so the event loop can
+    begin serving traffic immediately; /health reports the outcome.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    _migration_status["state"] = "running"
+    try:
+        await asyncio.to_thread(command.upgrade, Config("alembic.ini"), "head")
+        _migration_status["state"] = "ok"
+        logger.info("[OK] Background migrations complete")
+    except Exception:
+        _migration_status["state"] = "failed"
+        logger.exception("[ERROR] Background migrations failed")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
@@ -40,12 +130,34 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Zero-Backend-LLM Enforcement: {settings.ENFORCE_ZERO_BACKEND_LLM}")
 
-    # Constitutional compliance check
+    # Constitutional compliance checks (one-shot, off the Settings hot path)
+    validate_compliance(get_settings())
     if settings.ENFORCE_ZERO_BACKEND_LLM:
         _verify_zero_llm_compliance()
 
-    # Initialize database connection pool
-    # await db.connect()
+    # Optionally run schema migrations without blocking startup
+    if settings.MIGRATION_MODE == "async":
+        _migration_status["state"] = "pending"
+        asyncio.create_task(run_migrations_async())
+
+    # Initialize database connection pool and open it hot
+    db_manager.init_db()
+    await db_manager.prewarm()
+
+    # Keep dashboard aggregates fresh in the background
+    refresh_task = asyncio.create_task(_refresh_course_progress_view())
+
+    # Probe the database off the request path; /health serves the snapshot
+    health_task = asyncio.create_task(_health_loop())
+
+    # Drain deferred token-usage accounting on a timer; the buffer's own
+    # size/age checks only fire on the next record, so quiet periods need
+    # this loop to get their rows written
+    usage_flush_task = None
+    if getattr(settings, 'CURRENT_PHASE', 1) >= 2:
+        from backend.services.token_tracker import run_usage_flush_loop
+
+        usage_flush_task = asyncio.create_task(run_usage_flush_loop())
 
     # Initialize R2 client
     # await storage.init_r2_client()
@@ -57,8 +169,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Shutdown
     logger.info("[STOP] Shutting down application...")
 
+    refresh_task.cancel()
+    health_task.cancel()
+
+    # Final drain so buffered usage rows survive the restart
+    if usage_flush_task is not None:
+        usage_flush_task.cancel()
+
+        from backend.services.token_tracker import drain_usage_buffer
+
+        await drain_usage_buffer()
+
+    # Close pooled LLM connections (import stays behind the phase gate so
+    # Phase 1 never loads the anthropic module)
+    if getattr(settings, 'CURRENT_PHASE', 1) >= 2:
+        from backend.services.anthropic_client import anthropic_service
+
+        if anthropic_service is not None:
+            await anthropic_service.close()
+
     # Close database connections
-    # await db.disconnect()
+    await db_manager.close()
 
     # Close R2 client
     # await storage.close()
@@ -66,6 +197,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("[OK] Application shutdown complete")
 
 
+# Forbidden LLM client modules for Phase 1 (checked via set intersection
+# against sys.modules instead of a Python membership loop)
+_FORBIDDEN_LLM_MODULES = frozenset({"anthropic", "openai", "langchain", "llama_index"})
+
+
 def _verify_zero_llm_compliance() -> None:
     """
     Verify that no LLM client libraries are imported.
@@ -78,12 +214,7 @@ def _verify_zero_llm_compliance() -> None:
     current_phase = getattr(settings, 'CURRENT_PHASE', 1)
 
     if current_phase == 1:
-        forbidden_modules = ["anthropic", "openai", "langchain", "llama_index"]
-        violations = []
-
-        for module_name in forbidden_modules:
-            if module_name in sys.modules:
-                violations.append(module_name)
+        violations = sorted(_FORBIDDEN_LLM_MODULES & sys.modules.keys())
 
         if violations:
             error_msg = (
@@ -106,6 +237,9 @@ app = FastAPI(
     description=APP_DESCRIPTION,
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    # orjson serializes the nested course/chapter payloads in C, roughly
+    # 2-3x faster than the stdlib json encoder
+    default_response_class=ORJSONResponse,
     docs_url=settings.DOCS_URL if settings.DEBUG else None,
     redoc_url=settings.REDOC_URL if settings.DEBUG else None,
     openapi_url=settings.OPENAPI_URL if settings.DEBUG else None,
@@ -124,6 +258,12 @@ app.add_middleware(
     allow_headers=settings.ALLOWED_HEADERS,
 )
 
+# Compress text-heavy responses (chapter markdown, course listings);
+# small payloads stay uncompressed to avoid wasted CPU. Streaming
+# endpoints opt out with "Content-Encoding: identity" - gzipping SSE
+# would hold small events in the zlib buffer and deliver them late
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Trusted host middleware (security)
 if not settings.DEBUG:
     app.add_middleware(
@@ -138,13 +278,13 @@ if not settings.DEBUG:
 
 
 @app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def global_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """
     Global exception handler for unhandled errors.
     """
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "status": "error",
@@ -204,16 +344,20 @@ async def health_check() -> dict:
     """
     Health check endpoint for monitoring and load balancers.
 
+    Serves the cached snapshot maintained by _health_loop() - no database
+    round trip per poll, so LB polling never competes for pool connections.
+
     Returns:
         dict: Health status with component checks
     """
-    # TODO: Add actual health checks for database, R2, etc.
     return {
-        "status": "healthy",
+        "status": "healthy" if _last_health["database"] == "ok" else "degraded",
         "checks": {
-            "database": "ok",  # await db.health_check()
+            "database": _last_health["database"],
+            "replica_role": _last_health["replica_role"],
             "storage": "ok",  # await storage.health_check()
             "cache": "ok",
+            "migrations": _migration_status["state"],
         },
         "version": settings.APP_VERSION,
         "uptime": "0s",  # TODO: Calculate actual uptime
@@ -269,6 +413,8 @@ app.include_router(pricing.router, prefix="/api", tags=["pricing"])
 current_phase = getattr(settings, 'CURRENT_PHASE', 1)
 
 if current_phase >= 2:
+    from functools import lru_cache
+
     from fastapi import Depends
     from typing import Dict, Any, Optional
 
@@ -277,14 +423,19 @@ if current_phase >= 2:
 
     if AdaptiveLearningPathService and LLMGradingService and PremiumFeatureAccess and FeatureType:
 
+        # Singletons: constructing these per request would rebuild SQL
+        # engines and helper services on the hot path
+        @lru_cache(maxsize=1)
         def get_adaptive_learning_service():
             return AdaptiveLearningPathService(settings.DATABASE_URL)
 
 
+        @lru_cache(maxsize=1)
         def get_llm_grading_service():
             return LLMGradingService(settings.DATABASE_URL)
 
 
+        @lru_cache(maxsize=1)
         def get_premium_access_service():
             return PremiumFeatureAccess(settings.DATABASE_URL)
 
@@ -301,11 +452,9 @@ if current_phase >= 2:
             Generate an adaptive learning path for a user based on their performance.
             Phase 2: Hybrid Intelligence (Selective Premium) feature.
             """
-            import logging
-            logger = logging.getLogger(__name__)
             logger.info(f"Generating adaptive learning path for user: {user_id}")
 
-            result = service.generate_learning_path(
+            result = await service.generate_learning_path(
                 user_id=user_id,
                 user_performance_data=user_performance_data,
                 content_catalog=content_catalog,
@@ -319,6 +468,84 @@ if current_phase >= 2:
             return result
 
 
+        @app.post("/api/v1/adaptive-learning-path/stream", tags=["hybrid-intelligence"])
+        async def stream_adaptive_learning_path(
+            user_id: str,
+            user_performance_data: Dict[str, Any],
+            content_catalog: Dict[str, Any],
+            service = Depends(get_adaptive_learning_service)
+        ):
+            """
+            Stream an adaptive learning path to the client as server-sent events.
+            Phase 2: Hybrid Intelligence (Selective Premium) feature.
+            """
+            import json
+
+            from fastapi.responses import StreamingResponse
+
+            logger.info(f"Streaming adaptive learning path for user: {user_id}")
+
+            async def event_stream():
+                try:
+                    async for chunk in service.stream_learning_path(
+                        user_id=user_id,
+                        user_performance_data=user_performance_data,
+                        content_catalog=content_catalog
+                    ):
+                        yield f"data: {json.dumps(chunk)}\n\n"
+                except PermissionError as e:
+                    yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+                    return
+                yield "data: [DONE]\n\n"
+
+            # "identity" keeps the gzip middleware from buffering events
+            return StreamingResponse(
+                event_stream(),
+                media_type="text/event-stream",
+                headers={"Content-Encoding": "identity"},
+            )
+
+
+        @app.post("/api/v1/llm-grade-assessment/stream", tags=["hybrid-intelligence"])
+        async def stream_grade_assessment(
+            user_id: str,
+            question: str,
+            user_answer: str,
+            rubric: str,
+            service = Depends(get_llm_grading_service)
+        ):
+            """
+            Stream an LLM-graded assessment to the client as server-sent events.
+            Phase 2: Hybrid Intelligence (Selective Premium) feature.
+            """
+            import json
+
+            from fastapi.responses import StreamingResponse
+
+            logger.info(f"Streaming graded assessment for user: {user_id}")
+
+            async def event_stream():
+                try:
+                    async for chunk in service.stream_assessment_grading(
+                        user_id=user_id,
+                        question=question,
+                        user_answer=user_answer,
+                        rubric=rubric
+                    ):
+                        yield f"data: {json.dumps(chunk)}\n\n"
+                except PermissionError as e:
+                    yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+                    return
+                yield "data: [DONE]\n\n"
+
+            # "identity" keeps the gzip middleware from buffering events
+            return StreamingResponse(
+                event_stream(),
+                media_type="text/event-stream",
+                headers={"Content-Encoding": "identity"},
+            )
+
+
         @app.post("/api/v1/llm-grade-assessment", tags=["hybrid-intelligence"])
         async def grade_assessment(
             user_id: str,
@@ -332,11 +559,9 @@ if current_phase >= 2:
             Grade a free-form assessment answer using LLM evaluation.
             Phase 2: Hybrid Intelligence (Selective Premium) feature.
             """
-            import logging
-            logger = logging.getLogger(__name__)
             logger.info(f"Grading assessment for user: {user_id}")
 
-            result = service.grade_assessment(
+            result = await service.grade_assessment(
                 user_id=user_id,
                 question=question,
                 user_answer=user_answer,
@@ -361,11 +586,9 @@ if current_phase >= 2:
             """
             Grant premium access to a user for Phase 2 features.
             """
-            import logging
-            logger = logging.getLogger(__name__)
             logger.info(f"Granting premium access to user: {user_id}, tier: {tier}")
 
-            subscription = service.grant_premium_access(
+            subscription = await service.grant_premium_access(
                 user_id=user_id,
                 tier=tier,
                 duration_days=duration_days
@@ -391,11 +614,9 @@ if current_phase >= 2:
             """
             Revoke premium access from a user.
             """
-            import logging
-            logger = logging.getLogger(__name__)
             logger.info(f"Revoking premium access for user: {user_id}")
 
-            subscription = service.revoke_premium_access(user_id=user_id)
+            subscription = await service.revoke_premium_access(user_id=user_id)
 
             return {
                 "user_id": user_id,
@@ -416,11 +637,9 @@ if current_phase >= 2:
             """
             Check if a user has access to a specific premium feature.
             """
-            import logging
-            logger = logging.getLogger(__name__)
             logger.info(f"Checking access for user: {user_id}, feature: {feature}")
 
-            access_result = service.check_feature_access(user_id, feature)
+            access_result = await service.check_feature_access(user_id, feature)
 
             return {
                 "user_id": user_id,
@@ -5,11 +5,15 @@ This module provides functionality for generating personalized learning paths
 based on user performance data using LLM analysis.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from .anthropic_client import AnthropicClientService, anthropic_service
-from .token_tracker import TokenUsageTracker, TokenUsageCreate
+from .cache_utils import BoundedTTLCache
+from .token_tracker import TokenUsageTracker, TokenUsageCreate, record_usage_deferred
 from .premium_access import PremiumFeatureAccess, FeatureType
+import asyncio
+import hashlib
 import json
+import orjson
 
 
 class AdaptiveLearningPathService:
@@ -17,6 +21,18 @@ class AdaptiveLearningPathService:
     Service class for generating adaptive learning paths based on user performance.
     """
 
+    # Queued jobs are flushed through the Message Batches API once this
+    # many are pending (callers can also flush explicitly, e.g. on a timer)
+    BATCH_FLUSH_THRESHOLD = 20
+
+    # Up-front quota reservation per call (prompt + 500 output tokens);
+    # settled to the actual count after the response arrives
+    ESTIMATED_TOKENS_PER_CALL = 1500
+
+    # Catalog versions seen at once are few; serialized JSON per version
+    # is memoized so concurrent callers share one canonical string
+    CATALOG_CACHE_MAX_ENTRIES = 8
+
     def __init__(self, db_url: str):
         """
         Initialize the adaptive learning path service.
@@ -27,8 +43,37 @@ class AdaptiveLearningPathService:
         self.anthropic_service = anthropic_service
         self.token_tracker = TokenUsageTracker(db_url)
         self.premium_access = PremiumFeatureAccess(db_url)
+        self._pending_requests: List[Dict[str, Any]] = []
+        self._catalog_json_by_hash = BoundedTTLCache(
+            max_entries=self.CATALOG_CACHE_MAX_ENTRIES
+        )
+
+    def _serialize_catalog(self, content_catalog: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Serialize the catalog once per version and hash it.
+
+        The blake2b digest identifies the catalog version and prefixes
+        downstream cache keys, so key computation never re-hashes the
+        multi-kilobyte catalog JSON; identical versions also resolve to
+        one shared string instead of a fresh copy per request.
+
+        Returns:
+            Tuple of (catalog_hash, catalog_json)
+        """
+        serialized = orjson.dumps(content_catalog).decode()
+        catalog_hash = hashlib.blake2b(
+            serialized.encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+        cached = self._catalog_json_by_hash.get(catalog_hash)
+        if cached is not None:
+            return catalog_hash, cached
+
+        self._catalog_json_by_hash.set(catalog_hash, serialized)
 
-    def generate_learning_path(
+        return catalog_hash, serialized
+
+    async def generate_learning_path(
         self,
         user_id: str,
         user_performance_data: Dict[str, Any],
@@ -38,6 +83,9 @@ class AdaptiveLearningPathService:
         """
         Generate an adaptive learning path for a user based on their performance.
 
+        Awaitable end to end, so concurrent callers can fan out with
+        asyncio.gather instead of serializing multi-second LLM round trips.
+
         Args:
             user_id: User ID requesting the learning path
             user_performance_data: User's learning history and performance data
@@ -47,22 +95,32 @@ class AdaptiveLearningPathService:
         Returns:
             Dictionary containing personalized learning path recommendations
         """
-        # Check if user has access to this premium feature
-        access_result = self.premium_access.check_feature_access(user_id, FeatureType.ADAPTIVE_LEARNING_PATH)
+        # Check access and reserve quota in one locked transaction; the
+        # reservation is settled to the actual count after the call
+        reservation = await self.premium_access.reserve_tokens(
+            user_id, FeatureType.ADAPTIVE_LEARNING_PATH, self.ESTIMATED_TOKENS_PER_CALL
+        )
 
-        if not access_result["has_access"]:
+        if not reservation["has_access"]:
             return {
                 "error": "Access denied",
-                "message": access_result["reason"],
+                "message": reservation["reason"],
                 "recommendations": []
             }
 
-        # Generate the learning path using the Anthropic API
-        response = self.anthropic_service.generate_adaptive_learning_path(
+        # Generate the learning path using the Anthropic API; the catalog
+        # is pre-serialized and hashed per version so the model-side
+        # prompt cache and the local response cache both key off it
+        catalog_hash, catalog_json = self._serialize_catalog(content_catalog)
+
+        response = await self.anthropic_service.generate_adaptive_learning_path(
             user_performance_data,
-            content_catalog
+            catalog_json=catalog_json,
+            catalog_hash=catalog_hash
         )
 
+        await self.premium_access.settle_tokens(reservation, response["total_tokens"])
+
         # Record token usage
         usage_record = TokenUsageCreate(
             user_id=user_id,
@@ -74,10 +132,12 @@ class AdaptiveLearningPathService:
             model_used=response["model"]
         )
 
-        self.token_tracker.record_usage(usage_record)
-
-        # Increment user's token usage
-        self.premium_access.increment_token_usage(user_id, response["total_tokens"])
+        # Deferred accounting: the usage INSERT is buffered and flushed in
+        # bulk; the token counter was already charged by the reservation
+        record_usage_deferred(
+            usage_record, self.token_tracker, self.premium_access,
+            tokens_already_reserved=True
+        )
 
         # Parse the response to extract structured recommendations
         try:
@@ -108,43 +168,202 @@ class AdaptiveLearningPathService:
                 "error": f"Failed to parse recommendations: {str(e)}"
             }
 
-    def _parse_recommendations(self, recommendations_text: str, max_recommendations: int) -> List[Dict[str, Any]]:
+    async def stream_learning_path(
+        self,
+        user_id: str,
+        user_performance_data: Dict[str, Any],
+        content_catalog: Dict[str, Any]
+    ):
+        """
+        Stream a learning path generation chunk by chunk.
+
+        Quota is reserved up front and settled (plus the usage row
+        buffered) once the stream completes, so accounting matches the
+        non-streaming path.
+
+        Raises:
+            PermissionError: If the user lacks access to this feature
+
+        Yields:
+            Text chunks of the JSON recommendations payload
+        """
+        reservation = await self.premium_access.reserve_tokens(
+            user_id, FeatureType.ADAPTIVE_LEARNING_PATH, self.ESTIMATED_TOKENS_PER_CALL
+        )
+
+        if not reservation["has_access"]:
+            raise PermissionError(reservation["reason"])
+
+        async def _on_complete(usage: Dict[str, Any]) -> None:
+            await self.premium_access.settle_tokens(reservation, usage["total_tokens"])
+            record_usage_deferred(
+                TokenUsageCreate(
+                    user_id=user_id,
+                    feature=FeatureType.ADAPTIVE_LEARNING_PATH.value,
+                    input_tokens=usage["input_tokens"],
+                    output_tokens=usage["output_tokens"],
+                    total_tokens=usage["total_tokens"],
+                    cost_usd=0,  # Will be calculated by the tracker
+                    model_used=usage["model"]
+                ),
+                self.token_tracker,
+                self.premium_access,
+                tokens_already_reserved=True
+            )
+
+        async for chunk in self.anthropic_service.stream_adaptive_learning_path(
+            user_performance_data, content_catalog, on_complete=_on_complete
+        ):
+            yield chunk
+
+    async def enqueue_learning_path(
+        self,
+        user_id: str,
+        user_performance_data: Dict[str, Any],
+        content_catalog: Dict[str, Any],
+        max_recommendations: int = 5
+    ) -> Dict[str, Any]:
         """
-        Parse the LLM response to extract structured recommendations.
+        Queue a learning path generation for batched processing.
+
+        Non-interactive generations go through the Message Batches API
+        (half the per-token cost, asynchronous processing) instead of one
+        blocking API round trip per user.
 
         Args:
-            recommendations_text: Raw text response from the LLM
-            max_recommendations: Maximum number of recommendations to extract
+            user_id: User ID requesting the learning path
+            user_performance_data: User's learning history and performance data
+            content_catalog: Available content catalog
+            max_recommendations: Maximum number of recommendations to generate
 
         Returns:
-            List of structured recommendation dictionaries
+            Dictionary with queue status, or the flushed results if this
+            enqueue crossed the flush threshold
+        """
+        # Check access at enqueue time so denied users never consume batch slots
+        access_result = await self.premium_access.check_feature_access(user_id, FeatureType.ADAPTIVE_LEARNING_PATH)
+
+        if not access_result["has_access"]:
+            return {
+                "error": "Access denied",
+                "message": access_result["reason"],
+                "recommendations": []
+            }
+
+        self._pending_requests.append({
+            "user_id": user_id,
+            "user_performance_data": user_performance_data,
+            "content_catalog": content_catalog,
+            "max_recommendations": max_recommendations
+        })
+
+        if len(self._pending_requests) >= self.BATCH_FLUSH_THRESHOLD:
+            return {
+                "status": "flushed",
+                "results": await self.flush_pending_learning_paths()
+            }
+
+        return {
+            "status": "queued",
+            "pending": len(self._pending_requests)
+        }
+
+    async def flush_pending_learning_paths(self) -> Dict[str, Dict[str, Any]]:
         """
-        # This is a simplified parsing implementation
-        # In a real implementation, we would use more sophisticated parsing
-        # or potentially have the LLM return JSON directly
+        Submit all queued generations as one Message Batches call.
+
+        Accounting for the whole batch - the usage INSERT and the
+        coalesced per-user quota UPDATEs - is applied in one off-thread
+        transaction rather than one commit per user on the event loop.
+
+        Returns:
+            Dictionary mapping user_id to that user's learning path result
+        """
+        if not self._pending_requests:
+            return {}
+
+        pending, self._pending_requests = self._pending_requests, []
+
+        responses = await self.anthropic_service.generate_learning_paths_batch(pending)
 
-        recommendations = []
+        usage_records = []
+        token_deltas: Dict[str, int] = {}
+        results = {}
 
-        # Split the response into paragraphs/sections
-        sections = recommendations_text.split('\n\n')
+        for request in pending:
+            user_id = str(request["user_id"])
+            response = responses.get(user_id)
 
-        for section in sections[:max_recommendations]:
-            # Simple heuristic to identify recommendation-like content
-            if any(keyword in section.lower() for keyword in ['next', 'recommend', 'suggest', 'path', 'module']):
-                # Extract title and description
-                lines = section.strip().split('\n')
-                title = lines[0].strip(' .#-') if lines else "Learning Module"
+            if response is None:
+                results[user_id] = {
+                    "user_id": user_id,
+                    "recommendations": [],
+                    "error": "Batch entry failed"
+                }
+                continue
 
-                # Remove the title line and join the rest as description
-                description = '\n'.join(lines[1:]).strip() if len(lines) > 1 else section
+            usage_records.append(TokenUsageCreate(
+                user_id=user_id,
+                feature=FeatureType.ADAPTIVE_LEARNING_PATH.value,
+                input_tokens=response["input_tokens"],
+                output_tokens=response["output_tokens"],
+                total_tokens=response["total_tokens"],
+                cost_usd=0,  # Will be calculated by the tracker
+                model_used=response["model"]
+            ))
 
-                recommendations.append({
-                    "title": title,
-                    "description": description,
-                    "priority": len(recommendations) + 1  # Higher priority = more recommended
-                })
+            token_deltas[user_id] = (
+                token_deltas.get(user_id, 0) + response["total_tokens"]
+            )
+
+            results[user_id] = {
+                "user_id": user_id,
+                "recommendations": self._parse_recommendations(
+                    response["content"],
+                    request["max_recommendations"]
+                ),
+                "token_usage": {
+                    "input_tokens": response["input_tokens"],
+                    "output_tokens": response["output_tokens"],
+                    "total_tokens": response["total_tokens"]
+                }
+            }
+
+        # Same convention as the deferred-usage drain: the sync commit
+        # runs on a worker thread so it never blocks the event loop
+        await asyncio.to_thread(
+            self.token_tracker.record_and_increment_bulk,
+            usage_records, token_deltas
+        )
+
+        return results
+
+    def _parse_recommendations(self, recommendations_text: str, max_recommendations: int) -> List[Dict[str, Any]]:
+        """
+        Parse the JSON recommendations returned by the LLM.
+
+        The prompt (with assistant prefill) instructs Claude to answer
+        with {"recommendations": [...]} directly, so this is a plain
+        json.loads instead of the old split-and-keyword heuristics.
+
+        Args:
+            recommendations_text: Raw text response from the LLM
+            max_recommendations: Maximum number of recommendations to extract
+
+        Returns:
+            List of structured recommendation dictionaries
+        """
+        try:
+            payload = json.loads(recommendations_text)
+        except json.JSONDecodeError:
+            # Salvage responses that wrap the JSON object in prose
+            start = recommendations_text.find('{')
+            end = recommendations_text.rfind('}')
+            if start == -1 or end <= start:
+                raise
+            payload = json.loads(recommendations_text[start:end + 1])
 
-        return recommendations[:max_recommendations]
+        return payload["recommendations"][:max_recommendations]
 
     def get_user_learning_history(self, user_id: str) -> Dict[str, Any]:
         """
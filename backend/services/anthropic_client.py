@@ -5,16 +5,110 @@ This module provides a service for interacting with the Anthropic API,
 including token usage tracking and error handling for premium features.
 """
 
+import asyncio
+import functools
+import hashlib
+import json
 import os
 import logging
-from typing import Dict, Optional, Any
-from anthropic import Anthropic
+from typing import Dict, List, Optional, Any
+import httpx
+import orjson
+from anthropic import AsyncAnthropic
+from anthropic._tokenizers import sync_get_tokenizer
 from dotenv import load_dotenv
 
+from .cache_utils import BoundedTTLCache
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Offline BPE tokenizer, loaded once: counting tokens locally avoids a
+# network round trip per count and is cheap enough to run per segment
+_TOKENIZER = sync_get_tokenizer()
+
+
+@functools.lru_cache(maxsize=8192)
+def _count_tokens(text: str) -> int:
+    """Tokenize locally; memoized so shared catalogs/rubrics count once."""
+    return len(_TOKENIZER.encode(text).ids)
+
+# Responses are only cached for near-deterministic generations; higher
+# temperatures are expected to vary between calls
+_CACHE_TEMPERATURE_CEILING = 0.3
+
+# Prompt templates are baked once at import; structured data is injected
+# as canonical JSON (orjson, C-speed) rather than dict.__str__ repr.
+#
+# The learning path prompt is split so the (large, shared) catalog forms
+# a stable prefix block that Anthropic prompt caching can reuse across
+# users, while the per-user performance data varies in the suffix.
+_CATALOG_BLOCK_TEMPLATE = """
+        You are recommending a personalized learning path from the
+        following content catalog:
+
+        {cat}
+        """
+
+_LEARNING_PATH_REQUEST_TEMPLATE = """
+        User Performance Data:
+        {perf}
+
+        Please provide specific recommendations for the next learning modules
+        that would best suit this user's needs, considering their strengths
+        and areas for improvement.
+
+        Respond ONLY with JSON matching this schema:
+        {{"recommendations": [{{"title": str, "description": str, "priority": int}}, ...]}}
+        """
+
+# Server-side prompt caching (5-minute TTL on cache_control breakpoints)
+# is still gated behind a beta header on this API version
+_PROMPT_CACHING_HEADERS = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+_GRADING_TEMPLATE = """
+        Please grade the following answer according to the provided rubric:
+
+        Question: {question}
+
+        User Answer: {answer}
+
+        Rubric: {rubric}
+
+        Provide a score (out of 100) and detailed feedback explaining the score
+        and suggestions for improvement.
+        """
+
+
+def _response_cache_key(
+    model: str,
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+    assistant_prefill: str = ""
+) -> str:
+    """
+    Cache key for a deterministic LLM response.
+
+    Identical prompts (re-grading the same answer, regenerating from the
+    same catalog) skip the multi-second Claude round trip entirely. Keys
+    are sha256 over the full request parameters, so this is safe across
+    model or parameter changes; the "anthropic:<sha256>" scheme carries
+    over unchanged if the store ever moves out of process.
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "assistant_prefill": assistant_prefill,
+        },
+        sort_keys=True,
+    )
+    return "anthropic:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
 class AnthropicClientService:
     """
@@ -30,8 +124,35 @@ class AnthropicClientService:
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable is required")
 
-        self.client = Anthropic(api_key=api_key)
+        # Async client: LLM round trips take seconds, and awaiting them
+        # keeps the event loop serving other requests. Concurrent callers
+        # share the underlying httpx connection pool (fan out with
+        # asyncio.gather for server-side bulk work).
+        #
+        # HTTP/2 multiplexes concurrent calls over a few kept-alive
+        # connections, so fan-out doesn't pay a TLS handshake per call.
+        self._http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=200,
+                max_keepalive_connections=100,
+                keepalive_expiry=30,
+            ),
+        )
+        self.client = AsyncAnthropic(
+            api_key=api_key,
+            max_retries=2,
+            http_client=self._http_client,
+        )
         self.model = "claude-3-sonnet-20240229"  # Using Sonnet as per constitutional requirements
+        self._response_cache = BoundedTTLCache(max_entries=1024, ttl_seconds=86400)
+        # In-flight request coalescing, keyed like the response cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def close(self) -> None:
+        """Close the pooled HTTP connections (call from app shutdown)."""
+        await self._http_client.aclose()
 
     def get_token_count(self, text: str) -> int:
         """
@@ -43,88 +164,389 @@ class AnthropicClientService:
         Returns:
             Number of tokens in the text
         """
-        return self.client.count_tokens(text)
+        return _count_tokens(text)
 
-    def generate_content(
+    async def generate_content(
         self,
-        prompt: str,
+        prompt,
         max_tokens: int = 1000,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        assistant_prefill: Optional[str] = None,
+        cache_key_hint: Optional[str] = None,
+        extra_headers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         Generate content using the Anthropic API.
 
         Args:
-            prompt: Input prompt for content generation
+            prompt: Input prompt for content generation; either a plain
+                string or a list of content blocks (e.g. with
+                cache_control markers for prompt caching)
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature for generation
+            assistant_prefill: Optional assistant-turn prefill (e.g. "{"
+                to force a JSON object response); prepended to the
+                returned content
+            cache_key_hint: Optional compact stand-in for the prompt in
+                the local response-cache key (e.g. a catalog hash plus
+                the per-user payload), so keys are not recomputed over
+                multi-kilobyte prompts
+            extra_headers: Optional extra HTTP headers (e.g. the prompt
+                caching beta header)
 
         Returns:
             Dictionary containing response and token usage information
         """
+        # Near-deterministic generations are served from cache on repeats
+        cache_key = None
+        future = None
+        if temperature <= _CACHE_TEMPERATURE_CEILING:
+            cache_key = _response_cache_key(
+                self.model, cache_key_hint or prompt, max_tokens, temperature,
+                assistant_prefill or ""
+            )
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+
+            # Singleflight: concurrent identical calls (e.g. a cohort
+            # requesting paths from the same catalog before any cache
+            # write lands) all await the one request already in flight
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                return dict(await inflight)
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = future
+
         try:
-            response = self.client.messages.create(
+            result = await self._request_content(
+                prompt, max_tokens, temperature, assistant_prefill, extra_headers
+            )
+        except Exception as e:
+            if future is not None:
+                self._inflight.pop(cache_key, None)
+                future.set_exception(e)
+                # Mark retrieved so an abandoned future doesn't warn
+                future.exception()
+            raise
+
+        if future is not None:
+            self._response_cache.set(cache_key, dict(result))
+            self._inflight.pop(cache_key, None)
+            future.set_result(result)
+
+        return result
+
+    async def _request_content(
+        self,
+        prompt,
+        max_tokens: int,
+        temperature: float,
+        assistant_prefill: Optional[str],
+        extra_headers: Optional[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Perform one uncached Anthropic API round trip."""
+        messages = [{"role": "user", "content": prompt}]
+        if assistant_prefill:
+            messages.append({"role": "assistant", "content": assistant_prefill})
+
+        try:
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
+                messages=messages,
+                extra_headers=extra_headers,
             )
 
-            # Calculate token usage
-            input_tokens = response.usage.input_tokens
-            output_tokens = response.usage.output_tokens
-            total_tokens = input_tokens + output_tokens
-
-            return {
-                "content": response.content[0].text if response.content else "",
-                "input_tokens": input_tokens,
-                "output_tokens": output_tokens,
-                "total_tokens": total_tokens,
-                "model": self.model
-            }
-
         except Exception as e:
             logger.error(f"Error calling Anthropic API: {str(e)}")
             raise
 
-    def generate_adaptive_learning_path(
+        # Calculate token usage
+        input_tokens = response.usage.input_tokens
+        output_tokens = response.usage.output_tokens
+        total_tokens = input_tokens + output_tokens
+
+        content = response.content[0].text if response.content else ""
+        if assistant_prefill:
+            content = assistant_prefill + content
+
+        return {
+            "content": content,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": total_tokens,
+            "model": self.model
+        }
+
+    async def generate_adaptive_learning_path(
         self,
         user_performance_data: Dict[str, Any],
-        content_catalog: Dict[str, Any]
+        content_catalog: Optional[Dict[str, Any]] = None,
+        catalog_json: Optional[str] = None,
+        catalog_hash: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate adaptive learning path based on user performance.
 
+        The catalog is sent as its own content block with an ephemeral
+        cache_control marker, so repeated calls within Anthropic's
+        prompt-cache TTL only pay full input-token price for the per-user
+        performance suffix.
+
         Args:
             user_performance_data: User's learning history and performance
-            content_catalog: Available content catalog
+            content_catalog: Available content catalog (ignored when
+                catalog_json is supplied pre-serialized)
+            catalog_json: Optional pre-serialized catalog JSON, so callers
+                serving many users per catalog version serialize once
+            catalog_hash: Optional stable hash of the catalog version,
+                used as the local response-cache key prefix
 
         Returns:
             Personalized learning path recommendations
         """
-        prompt = f"""
-        Based on the following user performance data and content catalog,
-        recommend a personalized learning path:
+        if catalog_json is None:
+            catalog_json = orjson.dumps(content_catalog).decode()
+        if catalog_hash is None:
+            catalog_hash = hashlib.blake2b(catalog_json.encode("utf-8")).hexdigest()
+
+        perf_json = orjson.dumps(user_performance_data).decode()
+
+        content = [
+            {
+                "type": "text",
+                "text": _CATALOG_BLOCK_TEMPLATE.format(cat=catalog_json),
+                "cache_control": {"type": "ephemeral"},
+            },
+            {
+                "type": "text",
+                "text": _LEARNING_PATH_REQUEST_TEMPLATE.format(perf=perf_json),
+            },
+        ]
+
+        # Prefill "{" so the model must answer with the JSON object alone
+        return await self.generate_content(
+            content, max_tokens=500, assistant_prefill="{",
+            cache_key_hint=f"{catalog_hash}:{perf_json}",
+            extra_headers=_PROMPT_CACHING_HEADERS,
+        )
+
+    async def stream_content(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        assistant_prefill: Optional[str] = None,
+        on_complete=None
+    ):
+        """
+        Stream a generation, yielding text chunks as Claude produces them.
 
-        User Performance Data:
-        {user_performance_data}
+        Callers see the first token in a few hundred ms instead of
+        waiting for the full completion. Token cost is identical; usage
+        totals are delivered to on_complete once the stream finishes.
 
-        Content Catalog:
-        {content_catalog}
+        Args:
+            prompt: Input prompt for content generation
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature for generation
+            assistant_prefill: Optional assistant-turn prefill, yielded
+                first so the client sees the complete response
+            on_complete: Optional async callback receiving the usage
+                dictionary (input/output/total tokens and model) after
+                the stream ends
+
+        Yields:
+            Text chunks in generation order
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if assistant_prefill:
+            messages.append({"role": "assistant", "content": assistant_prefill})
+            yield assistant_prefill
+
+        async with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=messages,
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            message = await stream.get_final_message()
+
+        if on_complete is not None:
+            input_tokens = message.usage.input_tokens
+            output_tokens = message.usage.output_tokens
+            await on_complete({
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+                "model": self.model
+            })
 
-        Please provide specific recommendations for the next learning modules
-        that would best suit this user's needs, considering their strengths
-        and areas for improvement.
+    async def stream_adaptive_learning_path(
+        self,
+        user_performance_data: Dict[str, Any],
+        content_catalog: Dict[str, Any],
+        on_complete=None
+    ):
+        """Streaming variant of generate_adaptive_learning_path."""
+        prompt = self._learning_path_prompt(user_performance_data, content_catalog)
+
+        async for chunk in self.stream_content(
+            prompt, max_tokens=500, assistant_prefill="{", on_complete=on_complete
+        ):
+            yield chunk
+
+    async def stream_assessment_grading(
+        self,
+        question: str,
+        user_answer: str,
+        rubric: str,
+        on_complete=None
+    ):
+        """Streaming variant of grade_assessment."""
+        user_answer = " ".join(user_answer.split())
+
+        prompt = _GRADING_TEMPLATE.format(
+            question=question,
+            answer=user_answer,
+            rubric=rubric,
+        )
+
+        async for chunk in self.stream_content(
+            prompt, max_tokens=800, temperature=0.0, on_complete=on_complete
+        ):
+            yield chunk
+
+    def _learning_path_prompt(
+        self,
+        user_performance_data: Dict[str, Any],
+        content_catalog: Dict[str, Any]
+    ) -> str:
+        """Build the learning path prompt (shared by streaming and batch calls)."""
+        return _CATALOG_BLOCK_TEMPLATE.format(
+            cat=orjson.dumps(content_catalog).decode(),
+        ) + _LEARNING_PATH_REQUEST_TEMPLATE.format(
+            perf=orjson.dumps(user_performance_data).decode(),
+        )
+
+    async def generate_learning_paths_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        poll_interval_seconds: float = 5.0
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate many learning paths through the Message Batches API.
+
+        Batched requests are billed at half the per-token price and are
+        processed asynchronously, so this is the right path for queued or
+        scheduled (non-interactive) path generation.
+
+        Args:
+            requests: List of dicts with user_id, user_performance_data
+                and content_catalog keys
+            poll_interval_seconds: Delay between batch status polls
+
+        Returns:
+            Dictionary mapping user_id to the same result shape returned
+            by generate_content; failed entries are omitted
         """
+        # The pinned SDK (0.27) predates the Message Batches API; until
+        # the upgrade lands, fall back to concurrent individual calls -
+        # full per-token price, but the queued call sites keep working
+        if not hasattr(self.client.messages, "batches"):
+            return await self._generate_learning_paths_concurrent(requests)
+
+        batch = await self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": str(request["user_id"]),
+                    "params": {
+                        "model": self.model,
+                        "max_tokens": 500,
+                        "messages": [
+                            {
+                                "role": "user",
+                                "content": self._learning_path_prompt(
+                                    request["user_performance_data"],
+                                    request["content_catalog"]
+                                ),
+                            },
+                            # Same JSON prefill as the interactive path
+                            {"role": "assistant", "content": "{"},
+                        ],
+                    },
+                }
+                for request in requests
+            ]
+        )
+
+        # Poll until the batch finishes processing
+        while batch.processing_status != "ended":
+            await asyncio.sleep(poll_interval_seconds)
+            batch = await self.client.messages.batches.retrieve(batch.id)
+
+        results = {}
+        async for entry in await self.client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                logger.error(f"Batch entry {entry.custom_id} failed: {entry.result.type}")
+                continue
+
+            message = entry.result.message
+            input_tokens = message.usage.input_tokens
+            output_tokens = message.usage.output_tokens
+
+            results[entry.custom_id] = {
+                "content": "{" + (message.content[0].text if message.content else ""),
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+                "model": self.model
+            }
 
-        return self.generate_content(prompt, max_tokens=500)
+        return results
 
-    def grade_assessment(
+    async def _generate_learning_paths_concurrent(
+        self,
+        requests: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fallback for SDKs without the Message Batches API.
+
+        Fires the queued generations as concurrent Messages calls and
+        collects them into the same user_id-keyed mapping; failed entries
+        are logged and omitted, matching the batch path.
+        """
+        async def _generate(request: Dict[str, Any]) -> Dict[str, Any]:
+            return await self.generate_content(
+                self._learning_path_prompt(
+                    request["user_performance_data"],
+                    request["content_catalog"]
+                ),
+                max_tokens=500,
+                assistant_prefill="{"
+            )
+
+        outcomes = await asyncio.gather(
+            *(_generate(request) for request in requests),
+            return_exceptions=True
+        )
+
+        results = {}
+        for request, outcome in zip(requests, outcomes):
+            user_id = str(request["user_id"])
+            if isinstance(outcome, Exception):
+                logger.error(f"Batch entry {user_id} failed: {outcome}")
+                continue
+            results[user_id] = outcome
+
+        return results
+
+    async def grade_assessment(
         self,
         question: str,
         user_answer: str,
@@ -141,20 +563,19 @@ class AnthropicClientService:
         Returns:
             Grading results with score and feedback
         """
-        prompt = f"""
-        Please grade the following answer according to the provided rubric:
-
-        Question: {question}
-
-        User Answer: {user_answer}
-
-        Rubric: {rubric}
-
-        Provide a score (out of 100) and detailed feedback explaining the score
-        and suggestions for improvement.
-        """
-
-        return self.generate_content(prompt, max_tokens=800)
+        # Canonicalize whitespace so trivially-different submissions of
+        # the same answer hash to the same cache entry
+        user_answer = " ".join(user_answer.split())
+
+        prompt = _GRADING_TEMPLATE.format(
+            question=question,
+            answer=user_answer,
+            rubric=rubric,
+        )
+
+        # Grading should be reproducible, and temperature 0 also makes
+        # repeated gradings of the same answer cache hits
+        return await self.generate_content(prompt, max_tokens=800, temperature=0.0)
 
 
 # Singleton instance (lazy initialization)
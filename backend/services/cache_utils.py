@@ -0,0 +1,63 @@
+"""
+Shared bounded in-process cache for Course Companion FTE services
+"""
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class BoundedTTLCache:
+    """
+    Bounded in-process cache with optional per-entry TTL.
+
+    Several services keep small hot-path caches (signed URLs, LLM
+    responses, access decisions, course structures); this is the one
+    shared implementation of the capped-dict pattern they all hand-rolled.
+    When the cap is reached, the oldest insertion is evicted (dicts
+    preserve insertion order), keeping the memory footprint fixed.
+    Kept in-process since Redis is not part of this deployment; callers
+    own their key schemes, so the store can move there without touching
+    call sites.
+
+    Values are stored as given - callers handing out mutable values
+    should copy them on the way in and out.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[Optional[float], Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """Store a value, using the cache-wide TTL unless one is given."""
+        if key not in self._entries and len(self._entries) >= self._max_entries:
+            self._entries.pop(next(iter(self._entries)))
+
+        ttl = ttl_seconds if ttl_seconds is not None else self._ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires_at, value)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches the predicate."""
+        for key in [k for k in self._entries if predicate(k)]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
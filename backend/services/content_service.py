@@ -2,19 +2,41 @@
 Content Service for Course Companion FTE
 Handles course and chapter retrieval with R2 integration
 """
+import time
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, and_, func, select
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
 from backend.api.models.course import Course
 from backend.api.models.chapter import Chapter
 from backend.api.models.progress import Progress
 from backend.api.models.user import User
+from backend.services.cache_utils import BoundedTTLCache
 from backend.services.r2 import R2Client
 from backend.core.config import get_settings
 
 
+# Signed R2 URLs are valid for R2_SIGNED_URL_EXPIRY seconds, so repeat
+# views of the same chapter can reuse one URL instead of a fresh R2 call
+# per request. Keys are time-bucketed at half the expiry window and
+# entries die 60s before the URL itself, so a cached URL always has
+# meaningful validity left when handed out.
+_signed_url_cache = BoundedTTLCache(max_entries=2048)
+
+
+def _published_chapters_loader():
+    """
+    Eager-load only the published chapters of a course.
+
+    Course detail (and grid) views always walk course.chapters right
+    after loading the course; fetching them in the same execute avoids
+    the follow-up SELECT per course.
+    """
+    return selectinload(Course.chapters.and_(Chapter.is_published == True))
+
+
 class ContentService:
     """
     Service for managing course and chapter content delivery
@@ -38,9 +60,11 @@ class ContentService:
             published_only: Only return published courses
 
         Returns:
-            List of Course objects
+            List of Course objects (with published chapters eager-loaded)
         """
-        query = select(Course)
+        # One batched IN-query loads every course's chapters, instead of
+        # one SELECT per course when the grid renders chapter lists
+        query = select(Course).options(_published_chapters_loader())
 
         if published_only:
             query = query.where(Course.is_published == True)
@@ -63,7 +87,13 @@ class ContentService:
         Raises:
             HTTPException: If course not found
         """
-        course = await self.db.get(Course, course_id)
+        query = (
+            select(Course)
+            .where(Course.id == course_id)
+            .options(_published_chapters_loader())
+        )
+        result = await self.db.execute(query)
+        course = result.scalar_one_or_none()
 
         if not course:
             raise HTTPException(
@@ -92,7 +122,11 @@ class ContentService:
         Raises:
             HTTPException: If course not found
         """
-        query = select(Course).where(Course.slug == slug)
+        query = (
+            select(Course)
+            .where(Course.slug == slug)
+            .options(_published_chapters_loader())
+        )
         result = await self.db.execute(query)
         course = result.scalar_one_or_none()
 
@@ -114,28 +148,39 @@ class ContentService:
         self,
         course_id: int,
         user: Optional[User] = None
-    ) -> List[Chapter]:
+    ) -> List[Row]:
         """
         Get all chapters for a course
 
+        Only the columns the chapter list actually serializes are
+        selected, and the rows come back as lightweight Core tuples
+        (attribute access still works) instead of fully hydrated ORM
+        Chapter instances.
+
         Args:
             course_id: Course database ID
             user: Optional authenticated user for progress tracking
 
         Returns:
-            List of Chapter objects ordered by chapter_number
+            List of chapter rows ordered by chapter_number
         """
         query = (
-            select(Chapter)
+            select(
+                Chapter.id,
+                Chapter.chapter_number,
+                Chapter.slug,
+                Chapter.title,
+                Chapter.estimated_minutes,
+                Chapter.requires_premium,
+            )
             .where(Chapter.course_id == course_id)
             .where(Chapter.is_published == True)
             .order_by(Chapter.chapter_number)
         )
 
         result = await self.db.execute(query)
-        chapters = result.scalars().all()
 
-        return list(chapters)
+        return list(result.all())
 
     async def get_chapter_by_id(self, chapter_id: int) -> Chapter:
         """
@@ -187,20 +232,30 @@ class ContentService:
         if not expiry_minutes:
             expiry_minutes = self.settings.R2_SIGNED_URL_EXPIRY // 60
 
+        expiry_seconds = expiry_minutes * 60
+        bucket = int(time.time()) // max(expiry_seconds // 2, 1)
+        cache_key = f"r2url:{chapter.content_key}:{bucket}"
+
+        cached_url = _signed_url_cache.get(cache_key)
+        if cached_url is not None:
+            return cached_url
+
         try:
             signed_url = await self.r2_client.generate_signed_url(
                 key=chapter.content_key,
                 expiry_minutes=expiry_minutes
             )
 
-            return signed_url
-
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to generate content URL: {str(e)}"
             )
 
+        _signed_url_cache.set(cache_key, signed_url, ttl_seconds=expiry_seconds - 60)
+
+        return signed_url
+
     async def check_chapter_progress(
         self,
         user_id: int,
@@ -227,6 +282,38 @@ class ContentService:
 
         return progress
 
+    async def get_progress_last_update(
+        self,
+        user_id: int,
+        course_id: int
+    ):
+        """
+        Get the timestamp of the user's latest progress change in a course
+
+        A single indexed MAX(updated_at) aggregate, cheap enough to run
+        before the full course-detail assembly so unchanged progress can
+        be answered with 304 Not Modified instead of re-reading every
+        chapter and progress row.
+
+        Args:
+            user_id: User database ID
+            course_id: Course database ID
+
+        Returns:
+            Latest progress updated_at, or None if the user has no
+            progress rows in the course
+        """
+        query = (
+            select(func.max(Progress.updated_at))
+            .join(Chapter, Chapter.id == Progress.chapter_id)
+            .where(Progress.user_id == user_id)
+            .where(Chapter.course_id == course_id)
+        )
+
+        result = await self.db.execute(query)
+
+        return result.scalar()
+
     async def get_user_course_progress(
         self,
         user_id: int,
@@ -242,22 +329,30 @@ class ContentService:
         Returns:
             Dictionary with progress statistics
         """
-        # Get all chapters for the course
-        chapters = await self.get_course_chapters(course_id)
-        total_chapters = len(chapters)
-
-        # Get user's completed chapters
-        chapter_ids = [ch.id for ch in chapters]
+        # Single aggregate round trip: the outer join counts published
+        # chapters and the user's completed ones in one pass, instead of
+        # materializing chapter and progress rows to count in Python
         query = (
-            select(Progress)
-            .where(Progress.user_id == user_id)
-            .where(Progress.chapter_id.in_(chapter_ids))
-            .where(Progress.is_completed == True)
+            select(
+                func.count(Chapter.id).label("total"),
+                func.count(Progress.id)
+                .filter(Progress.is_completed == True)
+                .label("done"),
+            )
+            .select_from(Chapter)
+            .outerjoin(
+                Progress,
+                and_(
+                    Progress.chapter_id == Chapter.id,
+                    Progress.user_id == user_id,
+                ),
+            )
+            .where(Chapter.course_id == course_id)
+            .where(Chapter.is_published == True)
         )
 
         result = await self.db.execute(query)
-        completed_progress = result.scalars().all()
-        completed_chapters = len(completed_progress)
+        total_chapters, completed_chapters = result.one()
 
         progress_percentage = (
             (completed_chapters / total_chapters * 100)
@@ -7,16 +7,110 @@ using LLM analysis with detailed feedback.
 
 from typing import Dict, Any, Optional, List
 from .anthropic_client import AnthropicClientService, anthropic_service
-from .token_tracker import TokenUsageTracker, TokenUsageCreate
+from .cache_utils import BoundedTTLCache
+from .token_tracker import TokenUsageTracker, TokenUsageCreate, record_usage_deferred
 from .premium_access import PremiumFeatureAccess, FeatureType
+import hashlib
+import logging
 import re
 
+logger = logging.getLogger(__name__)
+
+
+# Grading responses are parsed with the same patterns on every call, so
+# they are compiled once at import instead of per grade
+_SCORE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'score[:\s]+(\d+)',
+    r'grade[:\s]+(\d+)',
+    r'(\d+)\s*/\s*100',
+    r'overall:\s*(\d+)'
+))
+
+# Base shape of the denied-access response; per-call copies only fill
+# in the denial reason
+_ACCESS_DENIED_BASE = {"error": "Access denied", "grade": None}
+
+# Standard rubric templates, built once at import instead of
+# reconstructing the dict on every create_rubric_template call
+_RUBRICS = {
+    "essay": """
+            Evaluate the essay based on the following criteria:
+            1. Content and Understanding (40%): Does the answer demonstrate understanding of the topic?
+            2. Organization and Structure (25%): Is the essay well-organized with clear introduction, body, and conclusion?
+            3. Language and Clarity (20%): Is the writing clear and free of grammatical errors?
+            4. Critical Thinking (15%): Does the answer show analytical thinking and insight?
+            """,
+    "short_answer": """
+            Evaluate the short answer based on the following criteria:
+            1. Accuracy (50%): Is the information provided factually correct?
+            2. Completeness (30%): Does the answer address all parts of the question?
+            3. Clarity (20%): Is the answer clear and concise?
+            """,
+    "problem_solving": """
+            Evaluate the problem-solving response based on the following criteria:
+            1. Methodology (40%): Is the approach to solving the problem logical and appropriate?
+            2. Correctness (40%): Is the final answer correct?
+            3. Explanation (20%): Are the steps clearly explained?
+            """,
+    "default": """
+            Evaluate the response based on the following criteria:
+            1. Accuracy (40%): Is the information provided factually correct?
+            2. Completeness (30%): Does the answer address all aspects of the question?
+            3. Clarity (30%): Is the answer clear and well-articulated?
+            """
+}
+
+# Fallback score inference: a single multi-keyword pass (the regex
+# engine runs the alternation as one scan, Aho-Corasick style) with a
+# dict lookup per hit; "very good" is ordered before "good" so the
+# longer phrase wins at the same position
+_RATING_RE = re.compile(
+    r'excellent|very good|good|satisfactory|needs improvement|poor',
+    re.IGNORECASE
+)
+
+_RATING_SCORES = {
+    'excellent': 90,
+    'very good': 80,
+    'good': 75,
+    'satisfactory': 70,
+    'needs improvement': 60,
+    'poor': 50,
+}
+
+# The indicator alternatives are fused into one alternation each, so
+# extraction scans the response text once instead of once per
+# indicator. The greedy MULTILINE `.*$` tail grabs the rest of the
+# line in one span, unlike the old lazy `.*?(?:\n|$)` tail that
+# backtracked on every character.
+_IMPROVEMENT_RE = re.compile(
+    r'(?:to improve|improvement|suggestion'
+    r'|needs work|could be better|lacks'
+    r'|consider|try|focus on).*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+_STRENGTH_RE = re.compile(
+    r'(?:good|excellent|well done|strong|great|nice'
+    r'|correct|accurate|precise|valid|appropriate'
+    r'|understanding|comprehension|knowledge).*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
 
 class LLMGradingService:
     """
     Service class for grading free-form assessment answers using LLM analysis.
     """
 
+    # Up-front quota reservation per grading call (prompt + 800 output
+    # tokens); settled to the actual count after the response arrives
+    ESTIMATED_TOKENS_PER_CALL = 1800
+
+    # Parsed grades per (question, answer, rubric); repeat submissions
+    # skip the LLM round trip, the quota debit, and the usage insert
+    GRADING_CACHE_MAX_ENTRIES = 1024
+
     def __init__(self, db_url: str):
         """
         Initialize the LLM grading service.
@@ -27,8 +121,17 @@ class LLMGradingService:
         self.anthropic_service = anthropic_service
         self.token_tracker = TokenUsageTracker(db_url)
         self.premium_access = PremiumFeatureAccess(db_url)
+        self._grading_cache = BoundedTTLCache(
+            max_entries=self.GRADING_CACHE_MAX_ENTRIES
+        )
+
+    @staticmethod
+    def _grading_cache_key(question: str, user_answer: str, rubric: str) -> str:
+        """Hash the full grading input (answer already canonicalized)."""
+        payload = f"{question}\0{user_answer}\0{rubric}"
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
 
-    def grade_assessment(
+    async def grade_assessment(
         self,
         user_id: str,
         question: str,
@@ -49,18 +152,41 @@ class LLMGradingService:
         Returns:
             Dictionary containing grading results with score and feedback
         """
-        # Check if user has access to this premium feature
-        access_result = self.premium_access.check_feature_access(user_id, FeatureType.LLM_GRADED_ASSESSMENTS)
-
-        if not access_result["has_access"]:
+        # Exact-match cache first: a repeat of the same (question,
+        # answer, rubric) costs neither an API call nor quota. Answers
+        # are whitespace-canonicalized to match the client's treatment.
+        canonical_answer = " ".join(user_answer.split())
+        cache_key = self._grading_cache_key(question, canonical_answer, rubric)
+
+        cached_grade = self._grading_cache.get(cache_key)
+        if cached_grade is not None:
+            logger.info(f"Grading cache hit for user {user_id}")
             return {
-                "error": "Access denied",
-                "message": access_result["reason"],
-                "grade": None
+                "user_id": user_id,
+                "assessment_id": assessment_id,
+                "grade": dict(cached_grade),
+                "token_usage": {
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "total_tokens": 0
+                },
+                "cost_usd": 0.0,
+                "cache_hit": True
             }
 
+        # Check access and reserve quota in one locked transaction; the
+        # reservation is settled to the actual count after the call
+        reservation = await self.premium_access.reserve_tokens(
+            user_id, FeatureType.LLM_GRADED_ASSESSMENTS, self.ESTIMATED_TOKENS_PER_CALL
+        )
+
+        if not reservation["has_access"]:
+            return {**_ACCESS_DENIED_BASE, "message": reservation["reason"]}
+
         # Grade the assessment using the Anthropic API
-        response = self.anthropic_service.grade_assessment(question, user_answer, rubric)
+        response = await self.anthropic_service.grade_assessment(question, user_answer, rubric)
+
+        await self.premium_access.settle_tokens(reservation, response["total_tokens"])
 
         # Record token usage
         usage_record = TokenUsageCreate(
@@ -73,15 +199,19 @@ class LLMGradingService:
             model_used=response["model"]
         )
 
-        self.token_tracker.record_usage(usage_record)
-
-        # Increment user's token usage
-        self.premium_access.increment_token_usage(user_id, response["total_tokens"])
+        # Deferred accounting: the usage INSERT is buffered and flushed in
+        # bulk; the token counter was already charged by the reservation
+        record_usage_deferred(
+            usage_record, self.token_tracker, self.premium_access,
+            tokens_already_reserved=True
+        )
 
         # Parse the response to extract structured grading information
         try:
             grading_result = self._parse_grading_response(response["content"])
 
+            self._grading_cache.set(cache_key, dict(grading_result))
+
             return {
                 "user_id": user_id,
                 "assessment_id": assessment_id,
@@ -103,6 +233,55 @@ class LLMGradingService:
                 "error": f"Failed to parse grading response: {str(e)}"
             }
 
+    async def stream_assessment_grading(
+        self,
+        user_id: str,
+        question: str,
+        user_answer: str,
+        rubric: str
+    ):
+        """
+        Stream a grading response chunk by chunk.
+
+        Quota is reserved up front and settled (plus the usage row
+        buffered) once the stream completes, so accounting matches the
+        non-streaming path.
+
+        Raises:
+            PermissionError: If the user lacks access to this feature
+
+        Yields:
+            Text chunks of the grading feedback
+        """
+        reservation = await self.premium_access.reserve_tokens(
+            user_id, FeatureType.LLM_GRADED_ASSESSMENTS, self.ESTIMATED_TOKENS_PER_CALL
+        )
+
+        if not reservation["has_access"]:
+            raise PermissionError(reservation["reason"])
+
+        async def _on_complete(usage: Dict[str, Any]) -> None:
+            await self.premium_access.settle_tokens(reservation, usage["total_tokens"])
+            record_usage_deferred(
+                TokenUsageCreate(
+                    user_id=user_id,
+                    feature=FeatureType.LLM_GRADED_ASSESSMENTS.value,
+                    input_tokens=usage["input_tokens"],
+                    output_tokens=usage["output_tokens"],
+                    total_tokens=usage["total_tokens"],
+                    cost_usd=0,  # Will be calculated by the tracker
+                    model_used=usage["model"]
+                ),
+                self.token_tracker,
+                self.premium_access,
+                tokens_already_reserved=True
+            )
+
+        async for chunk in self.anthropic_service.stream_assessment_grading(
+            question, user_answer, rubric, on_complete=_on_complete
+        ):
+            yield chunk
+
     def _parse_grading_response(self, grading_text: str) -> Dict[str, Any]:
         """
         Parse the LLM response to extract structured grading information.
@@ -113,17 +292,10 @@ class LLMGradingService:
         Returns:
             Dictionary containing structured grading information
         """
-        # Extract score using regex patterns
-        score_patterns = [
-            r'score[:\s]+(\d+)',
-            r'grade[:\s]+(\d+)',
-            r'(\d+)\s*/\s*100',
-            r'overall:\s*(\d+)'
-        ]
-
+        # Extract score using the precompiled patterns
         score = 0
-        for pattern in score_patterns:
-            match = re.search(pattern, grading_text, re.IGNORECASE)
+        for pattern in _SCORE_PATTERNS:
+            match = pattern.search(grading_text)
             if match:
                 try:
                     score = int(match.group(1))
@@ -131,42 +303,34 @@ class LLMGradingService:
                 except (ValueError, IndexError):
                     continue
 
-        # If no score found in the text, default to 0
+        # If no score found in the text, infer from common rating scales:
+        # one scan collects every keyword hit and the highest rating wins,
+        # matching the old if/elif precedence (excellent over good)
         if score == 0:
-            # Try to infer from common rating scales
-            if 'excellent' in grading_text.lower():
-                score = 90
-            elif 'very good' in grading_text.lower():
-                score = 80
-            elif 'good' in grading_text.lower():
-                score = 75
-            elif 'satisfactory' in grading_text.lower():
-                score = 70
-            elif 'needs improvement' in grading_text.lower():
-                score = 60
-            elif 'poor' in grading_text.lower():
-                score = 50
-
-        # Extract feedback sections
-        feedback_sections = []
-        lines = grading_text.split('\n')
-
-        current_section = ""
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith(('score', 'grade', 'overall')) and len(line) > 10:
-                current_section += line + "\n"
-
-        if current_section:
-            feedback_sections.append(current_section.strip())
-
-        # If no feedback sections found, use the entire response as feedback
-        if not feedback_sections:
-            feedback_sections = [grading_text]
+            score = max(
+                (
+                    _RATING_SCORES[match.group(0).lower()]
+                    for match in _RATING_RE.finditer(grading_text)
+                ),
+                default=0,
+            )
+
+        # Extract feedback in one pass: keep substantive lines, skipping
+        # score/grade headers case-insensitively (the old prefix check
+        # was case-sensitive and never matched typical "Score:" output)
+        feedback = "\n".join(
+            line for line in map(str.strip, grading_text.split('\n'))
+            if len(line) > 10
+            and not line.lower().startswith(('score', 'grade', 'overall'))
+        )
+
+        # If no feedback lines survive, use the entire response as feedback
+        if not feedback:
+            feedback = grading_text
 
         return {
             "score": min(max(score, 0), 100),  # Ensure score is between 0 and 100
-            "feedback": feedback_sections[0] if feedback_sections else "No detailed feedback provided",
+            "feedback": feedback,
             "improvement_suggestions": self._extract_improvement_suggestions(grading_text),
             "strengths_identified": self._extract_strengths(grading_text)
         }
@@ -181,26 +345,14 @@ class LLMGradingService:
         Returns:
             List of improvement suggestions
         """
-        suggestions = []
-
-        # Look for common improvement suggestion indicators
-        improvement_indicators = [
-            r'(?:to improve|improvement|suggestion).*?(?:\n|$)',
-            r'(?:needs work|could be better|lacks).*?(?:\n|$)',
-            r'(?:consider|try|focus on).*?(?:\n|$)'
-        ]
-
-        for indicator in improvement_indicators:
-            matches = re.findall(indicator, grading_text, re.IGNORECASE)
-            suggestions.extend([match.strip(': ') for match in matches if len(match.strip()) > 10])
-
-        # Remove duplicates while preserving order
-        unique_suggestions = []
-        for suggestion in suggestions:
-            if suggestion not in unique_suggestions:
-                unique_suggestions.append(suggestion)
-
-        return unique_suggestions
+        # Single pass over the text; the alternation covers every
+        # indicator, and dict.fromkeys drops duplicates in O(n) while
+        # preserving first-seen order
+        return list(dict.fromkeys(
+            match.group(0).strip(': ')
+            for match in _IMPROVEMENT_RE.finditer(grading_text)
+            if len(match.group(0).strip()) > 10
+        ))
 
     def _extract_strengths(self, grading_text: str) -> List[str]:
         """
@@ -212,26 +364,14 @@ class LLMGradingService:
         Returns:
             List of strengths identified
         """
-        strengths = []
-
-        # Look for common strength indicators
-        strength_indicators = [
-            r'(?:good|excellent|well done|strong|great|nice).*?(?:\n|$)',
-            r'(?:correct|accurate|precise|valid|appropriate).*?(?:\n|$)',
-            r'(?:understanding|comprehension|knowledge).*?(?:\n|$)'
-        ]
-
-        for indicator in strength_indicators:
-            matches = re.findall(indicator, grading_text, re.IGNORECASE)
-            strengths.extend([match.strip(': ') for match in matches if len(match.strip()) > 10])
-
-        # Remove duplicates while preserving order
-        unique_strengths = []
-        for strength in strengths:
-            if strength not in unique_strengths:
-                unique_strengths.append(strength)
-
-        return unique_strengths
+        # Single pass over the text; the alternation covers every
+        # indicator, and dict.fromkeys drops duplicates in O(n) while
+        # preserving first-seen order
+        return list(dict.fromkeys(
+            match.group(0).strip(': ')
+            for match in _STRENGTH_RE.finditer(grading_text)
+            if len(match.group(0).strip()) > 10
+        ))
 
     def create_rubric_template(self, question_type: str) -> str:
         """
@@ -243,32 +383,4 @@ class LLMGradingService:
         Returns:
             Standard rubric template
         """
-        rubrics = {
-            "essay": """
-            Evaluate the essay based on the following criteria:
-            1. Content and Understanding (40%): Does the answer demonstrate understanding of the topic?
-            2. Organization and Structure (25%): Is the essay well-organized with clear introduction, body, and conclusion?
-            3. Language and Clarity (20%): Is the writing clear and free of grammatical errors?
-            4. Critical Thinking (15%): Does the answer show analytical thinking and insight?
-            """,
-            "short_answer": """
-            Evaluate the short answer based on the following criteria:
-            1. Accuracy (50%): Is the information provided factually correct?
-            2. Completeness (30%): Does the answer address all parts of the question?
-            3. Clarity (20%): Is the answer clear and concise?
-            """,
-            "problem_solving": """
-            Evaluate the problem-solving response based on the following criteria:
-            1. Methodology (40%): Is the approach to solving the problem logical and appropriate?
-            2. Correctness (40%): Is the final answer correct?
-            3. Explanation (20%): Are the steps clearly explained?
-            """,
-            "default": """
-            Evaluate the response based on the following criteria:
-            1. Accuracy (40%): Is the information provided factually correct?
-            2. Completeness (30%): Does the answer address all aspects of the question?
-            3. Clarity (30%): Is the answer clear and well-articulated?
-            """
-        }
-
-        return rubrics.get(question_type, rubrics["default"])
\ No newline at end of file
+        return _RUBRICS.get(question_type, _RUBRICS["default"])
\ No newline at end of file
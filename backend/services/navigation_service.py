@@ -2,15 +2,50 @@
 Navigation Service for Course Companion FTE
 Handles chapter navigation and course structure retrieval
 """
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import and_, select, func
 from fastapi import HTTPException, status
 
 from backend.api.models.chapter import Chapter
 from backend.api.models.course import Course
 from backend.api.models.progress import Progress
 from backend.api.models.user import User
+from backend.api.models.user_streak import UserStreak
+from backend.services.cache_utils import BoundedTTLCache
+
+
+# Assembled course structures, keyed by (course_id, user_id, progress
+# version). The version is the user's latest progress updated_at, so a
+# chapter completion changes the key and the stale entry simply stops
+# being hit; the TTL bounds staleness from course edits. Module-level
+# because the service itself is constructed per request.
+_structure_cache = BoundedTTLCache(max_entries=50_000, ttl_seconds=60.0)
+
+
+@dataclass(slots=True)
+class ChapterProgressEntry:
+    """
+    One chapter row in the course structure response.
+
+    Slotted dataclass instead of a 10-key dict per chapter: one C-level
+    allocation, no per-key hashing, roughly half the per-row memory on
+    large courses. Pydantic validates it via from_attributes.
+    """
+    id: int
+    chapter_number: int
+    slug: str
+    title: str
+    description: str
+    estimated_minutes: int
+    requires_premium: bool
+    is_completed: bool
+    time_spent_seconds: int
+    # Raw datetime: the JSON layer (pydantic/orjson) renders it in C,
+    # which beats materializing an isoformat() string per row
+    completed_at: Optional[datetime]
 
 
 class NavigationService:
@@ -93,6 +128,56 @@ class NavigationService:
 
         return prev_chapter
 
+    async def get_adjacent_chapters(
+        self,
+        current_chapter: Chapter
+    ) -> Tuple[Optional[Chapter], Optional[Chapter]]:
+        """
+        Get both neighbors of an already-loaded chapter in one query
+
+        Scalar subqueries pick the nearest chapter_number on each side,
+        so the previous and next chapters come back in a single round
+        trip instead of one range scan per direction.
+
+        Args:
+            current_chapter: The chapter to find neighbors for
+
+        Returns:
+            Tuple of (previous_chapter, next_chapter); either may be None
+        """
+        previous_number = (
+            select(func.max(Chapter.chapter_number))
+            .where(Chapter.course_id == current_chapter.course_id)
+            .where(Chapter.is_published == True)
+            .where(Chapter.chapter_number < current_chapter.chapter_number)
+            .scalar_subquery()
+        )
+        next_number = (
+            select(func.min(Chapter.chapter_number))
+            .where(Chapter.course_id == current_chapter.course_id)
+            .where(Chapter.is_published == True)
+            .where(Chapter.chapter_number > current_chapter.chapter_number)
+            .scalar_subquery()
+        )
+
+        query = (
+            select(Chapter)
+            .where(Chapter.course_id == current_chapter.course_id)
+            .where(Chapter.is_published == True)
+            .where(Chapter.chapter_number.in_((previous_number, next_number)))
+        )
+        result = await self.db.execute(query)
+
+        previous_chapter = None
+        next_chapter = None
+        for chapter in result.scalars():
+            if chapter.chapter_number < current_chapter.chapter_number:
+                previous_chapter = chapter
+            else:
+                next_chapter = chapter
+
+        return previous_chapter, next_chapter
+
     async def get_chapter_navigation(
         self,
         chapter_id: int,
@@ -119,9 +204,39 @@ class NavigationService:
                 detail=f"Chapter with ID {chapter_id} not found"
             )
 
-        # Get next and previous chapters
-        next_chapter = await self.get_next_chapter(chapter_id)
-        previous_chapter = await self.get_previous_chapter(chapter_id)
+        # Resolve both neighbors in one IN query when the chapter links
+        # are populated (the common case); fall back to the per-direction
+        # helpers for missing links or unpublished link targets
+        next_chapter = None
+        previous_chapter = None
+        linked_ids = [
+            linked_id for linked_id in (
+                current_chapter.next_chapter_id,
+                current_chapter.previous_chapter_id,
+            )
+            if linked_id is not None
+        ]
+        if linked_ids:
+            result = await self.db.execute(
+                select(Chapter)
+                .where(Chapter.id.in_(linked_ids))
+                .where(Chapter.is_published == True)
+            )
+            neighbors = {ch.id: ch for ch in result.scalars()}
+            next_chapter = neighbors.get(current_chapter.next_chapter_id)
+            previous_chapter = neighbors.get(current_chapter.previous_chapter_id)
+
+        # Any neighbor the links didn't resolve comes from one fused
+        # nearest-chapter_number query (both directions at once), using
+        # the already-loaded current chapter instead of re-fetching it
+        if next_chapter is None or previous_chapter is None:
+            fallback_previous, fallback_next = await self.get_adjacent_chapters(
+                current_chapter
+            )
+            if next_chapter is None:
+                next_chapter = fallback_next
+            if previous_chapter is None:
+                previous_chapter = fallback_previous
 
         # Calculate progress percentage
         progress_percentage = 0.0
@@ -151,6 +266,24 @@ class NavigationService:
         Raises:
             HTTPException: If course not found
         """
+        # Cheap primer: one indexed MAX() versions the user's progress in
+        # this course, so an unchanged structure is served from cache
+        # with zero further queries
+        version_query = (
+            select(func.max(Progress.updated_at))
+            .join(Chapter, Chapter.id == Progress.chapter_id)
+            .where(Progress.user_id == user_id)
+            .where(Chapter.course_id == course_id)
+        )
+        version_result = await self.db.execute(version_query)
+        last_progress = version_result.scalar()
+        progress_version = int(last_progress.timestamp()) if last_progress else 0
+
+        cache_key = (course_id, user_id, progress_version)
+        cached = _structure_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
         # Get course
         course = await self.db.get(Course, course_id)
         if not course or not course.is_published:
@@ -159,64 +292,81 @@ class NavigationService:
                 detail=f"Course with ID {course_id} not found"
             )
 
-        # Get all chapters for the course
+        # One outer join fetches every chapter with the user's matching
+        # progress row, replacing the separate chapter and progress
+        # selects (and the IN-list round trip between them). Only the
+        # serialized columns are selected, so rows come back as
+        # lightweight Core tuples instead of full ORM instances.
         query = (
-            select(Chapter)
+            select(
+                Chapter.id,
+                Chapter.chapter_number,
+                Chapter.slug,
+                Chapter.title,
+                Chapter.description,
+                Chapter.estimated_minutes,
+                Chapter.requires_premium,
+                Progress.is_completed,
+                Progress.time_spent_seconds,
+                Progress.completed_at,
+            )
+            .outerjoin(
+                Progress,
+                and_(
+                    Progress.chapter_id == Chapter.id,
+                    Progress.user_id == user_id,
+                ),
+            )
             .where(Chapter.course_id == course_id)
             .where(Chapter.is_published == True)
             .order_by(Chapter.chapter_number)
         )
         result = await self.db.execute(query)
-        chapters = result.scalars().all()
-
-        # Get user's progress for all chapters
-        chapter_ids = [ch.id for ch in chapters]
-        progress_query = (
-            select(Progress)
-            .where(Progress.user_id == user_id)
-            .where(Progress.chapter_id.in_(chapter_ids))
-        )
-        progress_result = await self.db.execute(progress_query)
-        progress_records = {p.chapter_id: p for p in progress_result.scalars().all()}
+        rows = result.all()
 
-        # Build chapter list with progress
+        # Build chapter list with progress, tallying completion and time
+        # spent in the same pass instead of re-querying aggregates;
+        # progress columns are NULL where the user has no row
         chapters_with_progress = []
-        for chapter in chapters:
-            progress = progress_records.get(chapter.id)
-            chapters_with_progress.append({
-                "id": chapter.id,
-                "chapter_number": chapter.chapter_number,
-                "slug": chapter.slug,
-                "title": chapter.title,
-                "description": chapter.description,
-                "estimated_minutes": chapter.estimated_minutes,
-                "requires_premium": chapter.requires_premium,
-                "is_completed": progress.is_completed if progress else False,
-                "time_spent_seconds": progress.time_spent_seconds if progress else 0,
-                "completed_at": progress.completed_at.isoformat() if progress and progress.completed_at else None
-            })
-
-        # Calculate overall progress
-        progress_percentage = await self._calculate_course_progress(user_id, course_id)
+        completed_chapters = 0
+        total_time_spent = 0
+        for row in rows:
+            if row.is_completed:
+                completed_chapters += 1
+            if row.time_spent_seconds:
+                total_time_spent += row.time_spent_seconds
+            chapters_with_progress.append(ChapterProgressEntry(
+                id=row.id,
+                chapter_number=row.chapter_number,
+                slug=row.slug,
+                title=row.title,
+                description=row.description,
+                estimated_minutes=row.estimated_minutes,
+                requires_premium=row.requires_premium,
+                is_completed=bool(row.is_completed),
+                time_spent_seconds=row.time_spent_seconds or 0,
+                completed_at=row.completed_at
+            ))
+
+        total_chapters = len(rows)
+        progress_percentage = (
+            round(completed_chapters / total_chapters * 100, 2)
+            if total_chapters > 0 else 0.0
+        )
 
         # Get streak information
         streak_info = await self._get_streak_info(user_id)
 
-        # Calculate total time spent
-        total_time_spent = sum(
-            p.time_spent_seconds for p in progress_records.values()
-        )
-
-        return {
+        structure = {
             "course_id": course.id,
             "course_title": course.title,
             "course_slug": course.slug,
-            "total_chapters": len(chapters),
+            "total_chapters": total_chapters,
             "free_chapter_limit": course.free_chapter_limit,
             "chapters": chapters_with_progress,
             "user_progress": {
-                "completed_chapters": sum(1 for ch in chapters_with_progress if ch["is_completed"]),
-                "total_chapters": len(chapters),
+                "completed_chapters": completed_chapters,
+                "total_chapters": total_chapters,
                 "progress_percentage": progress_percentage,
                 "current_streak": streak_info["current_streak"],
                 "longest_streak": streak_info["longest_streak"],
@@ -224,6 +374,10 @@ class NavigationService:
             }
         }
 
+        _structure_cache.set(cache_key, structure)
+
+        return structure
+
     async def _calculate_course_progress(
         self,
         user_id: int,
@@ -239,31 +393,34 @@ class NavigationService:
         Returns:
             Progress percentage (0-100)
         """
-        # Get total chapters
-        total_query = (
-            select(func.count(Chapter.id))
+        # Single aggregate round trip: the outer join counts published
+        # chapters and the user's completed ones in one pass
+        query = (
+            select(
+                func.count(Chapter.id).label("total"),
+                func.count(Progress.id)
+                .filter(Progress.is_completed == True)
+                .label("done"),
+            )
+            .select_from(Chapter)
+            .outerjoin(
+                Progress,
+                and_(
+                    Progress.chapter_id == Chapter.id,
+                    Progress.user_id == user_id,
+                ),
+            )
             .where(Chapter.course_id == course_id)
             .where(Chapter.is_published == True)
         )
-        total_result = await self.db.execute(total_query)
-        total_chapters = total_result.scalar() or 0
+
+        result = await self.db.execute(query)
+        total_chapters, completed_chapters = result.one()
 
         if total_chapters == 0:
             return 0.0
 
-        # Get completed chapters
-        completed_query = (
-            select(func.count(Progress.id))
-            .join(Chapter, Progress.chapter_id == Chapter.id)
-            .where(Chapter.course_id == course_id)
-            .where(Progress.user_id == user_id)
-            .where(Progress.is_completed == True)
-        )
-        completed_result = await self.db.execute(completed_query)
-        completed_chapters = completed_result.scalar() or 0
-
-        progress_percentage = (completed_chapters / total_chapters) * 100
-        return round(progress_percentage, 2)
+        return round((completed_chapters / total_chapters) * 100, 2)
 
     async def _get_streak_info(self, user_id: int) -> dict:
         """
@@ -275,21 +432,13 @@ class NavigationService:
         Returns:
             Dictionary with current_streak and longest_streak
         """
-        # Get any progress record to check streak info
-        # (streak is stored at the user level across all progress records)
-        query = (
-            select(Progress)
-            .where(Progress.user_id == user_id)
-            .order_by(Progress.updated_at.desc())
-            .limit(1)
-        )
-        result = await self.db.execute(query)
-        progress = result.scalar_one_or_none()
+        # Streak state lives in user_streaks - a primary-key lookup
+        streak = await self.db.get(UserStreak, user_id)
 
-        if progress:
+        if streak:
             return {
-                "current_streak": progress.current_streak,
-                "longest_streak": progress.longest_streak
+                "current_streak": streak.current_streak,
+                "longest_streak": streak.longest_streak
             }
         else:
             return {
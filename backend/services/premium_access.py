@@ -5,11 +5,17 @@ This module provides functionality for controlling access to premium features
 based on user subscription status and feature availability.
 """
 
+from contextlib import asynccontextmanager
 from typing import Dict, Optional
 from enum import Enum
-from sqlmodel import SQLModel, Field, create_engine, Session, select
+from sqlmodel import SQLModel, Field, select
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 import datetime
 
+from .cache_utils import BoundedTTLCache
+from .token_tracker import get_shared_async_engine
+
 
 class FeatureType(str, Enum):
     """Enumeration of available premium features."""
@@ -34,8 +40,16 @@ class UserSubscription(SQLModel, table=True):
 class PremiumFeatureAccess:
     """
     Service class for managing access to premium features.
+
+    All database work goes through AsyncSession so access checks and
+    quota writes never block the event loop the FastAPI handlers run on.
     """
 
+    # Access checks are re-answered from cache for this long before the
+    # subscription row is re-read; plan changes invalidate immediately
+    ACCESS_CACHE_TTL_SECONDS = 30.0
+    ACCESS_CACHE_MAX_ENTRIES = 10_000
+
     def __init__(self, db_url: str):
         """
         Initialize the premium feature access controller with database connection.
@@ -43,13 +57,40 @@ class PremiumFeatureAccess:
         Args:
             db_url: Database connection URL
         """
-        self.engine = create_engine(db_url)
-        SQLModel.metadata.create_all(self.engine)  # Create tables if they don't exist
-
-    def check_feature_access(self, user_id: str, feature: FeatureType) -> Dict[str, bool]:
+        self.engine = get_shared_async_engine(db_url)
+        self._session_factory = async_sessionmaker(
+            self.engine, expire_on_commit=False
+        )
+        self._tables_ready = False
+        self._access_cache = BoundedTTLCache(
+            max_entries=self.ACCESS_CACHE_MAX_ENTRIES,
+            ttl_seconds=self.ACCESS_CACHE_TTL_SECONDS,
+        )
+
+    @asynccontextmanager
+    async def _session(self):
+        """Open a session, creating the tables on first use."""
+        if not self._tables_ready:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.create_all)
+            self._tables_ready = True
+
+        async with self._session_factory() as session:
+            yield session
+
+    def _invalidate_access_cache(self, user_id: str) -> None:
+        """Drop cached access decisions for a user (plan/usage change)."""
+        self._access_cache.invalidate(lambda key: key[0] == user_id)
+
+    async def check_feature_access(self, user_id: str, feature: FeatureType) -> Dict[str, bool]:
         """
         Check if a user has access to a specific premium feature.
 
+        Decisions are cached per (user, feature) for a short TTL, so
+        high-frequency callers skip the subscription SELECT; every write
+        to the subscription row (grants, revokes, usage increments and
+        settlements, resets) invalidates the user's entries.
+
         Args:
             user_id: User ID to check access for
             feature: Feature to check access for
@@ -57,10 +98,23 @@ class PremiumFeatureAccess:
         Returns:
             Dictionary with access status and reason
         """
-        with Session(self.engine) as session:
+        cache_key = (user_id, feature.value)
+        cached = self._access_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        result = await self._check_feature_access_uncached(user_id)
+        self._access_cache.set(cache_key, dict(result))
+
+        return result
+
+    async def _check_feature_access_uncached(self, user_id: str) -> Dict[str, bool]:
+        """Read the subscription row and derive the access decision."""
+        async with self._session() as session:
             # Get user subscription info
             statement = select(UserSubscription).where(UserSubscription.user_id == user_id)
-            user_subscription = session.exec(statement).first()
+            result = await session.execute(statement)
+            user_subscription = result.scalars().first()
 
             if not user_subscription:
                 # User doesn't exist in subscription table, default to no premium access
@@ -93,7 +147,7 @@ class PremiumFeatureAccess:
                 "reason": "Access granted"
             }
 
-    def grant_premium_access(self, user_id: str, tier: str = "premium", duration_days: int = 30) -> UserSubscription:
+    async def grant_premium_access(self, user_id: str, tier: str = "premium", duration_days: int = 30) -> UserSubscription:
         """
         Grant premium access to a user.
 
@@ -105,10 +159,11 @@ class PremiumFeatureAccess:
         Returns:
             Updated UserSubscription object
         """
-        with Session(self.engine) as session:
+        async with self._session() as session:
             # Check if user already exists in subscription table
             statement = select(UserSubscription).where(UserSubscription.user_id == user_id)
-            existing_subscription = session.exec(statement).first()
+            result = await session.execute(statement)
+            existing_subscription = result.scalars().first()
 
             start_date = datetime.datetime.now(datetime.timezone.utc)
             end_date = start_date + datetime.timedelta(days=duration_days)
@@ -144,17 +199,18 @@ class PremiumFeatureAccess:
                 )
                 session.add(new_subscription)
 
-            session.commit()
+            await session.commit()
+            self._invalidate_access_cache(user_id)
 
             # Return the updated/created subscription
             if existing_subscription:
-                session.refresh(existing_subscription)
+                await session.refresh(existing_subscription)
                 return existing_subscription
             else:
-                session.refresh(new_subscription)
+                await session.refresh(new_subscription)
                 return new_subscription
 
-    def revoke_premium_access(self, user_id: str) -> UserSubscription:
+    async def revoke_premium_access(self, user_id: str) -> UserSubscription:
         """
         Revoke premium access from a user.
 
@@ -164,9 +220,10 @@ class PremiumFeatureAccess:
         Returns:
             Updated UserSubscription object
         """
-        with Session(self.engine) as session:
+        async with self._session() as session:
             statement = select(UserSubscription).where(UserSubscription.user_id == user_id)
-            user_subscription = session.exec(statement).first()
+            result = await session.execute(statement)
+            user_subscription = result.scalars().first()
 
             if not user_subscription:
                 # Create a subscription record if it doesn't exist
@@ -188,15 +245,22 @@ class PremiumFeatureAccess:
                 user_subscription.used_monthly_tokens = 0
                 user_subscription.max_monthly_tokens = 10000  # Free tier limit
 
-            session.commit()
-            session.refresh(user_subscription)
+            await session.commit()
+            await session.refresh(user_subscription)
+            self._invalidate_access_cache(user_id)
 
             return user_subscription
 
-    def increment_token_usage(self, user_id: str, tokens_used: int) -> bool:
+    async def increment_token_usage(self, user_id: str, tokens_used: int) -> bool:
         """
         Increment the token usage for a user.
 
+        Issues one guarded UPDATE instead of a SELECT-then-UPDATE pair:
+        the quota check rides in the WHERE clause, so the increment is a
+        single atomic round trip and two concurrent calls cannot both
+        slip under the limit. A miss (user unknown or limit would be
+        exceeded) simply matches zero rows.
+
         Args:
             user_id: User ID to increment token usage for
             tokens_used: Number of tokens to add to usage
@@ -204,27 +268,146 @@ class PremiumFeatureAccess:
         Returns:
             True if successful, False if user exceeded limit
         """
-        with Session(self.engine) as session:
-            statement = select(UserSubscription).where(UserSubscription.user_id == user_id)
-            user_subscription = session.exec(statement).first()
+        async with self._session() as session:
+            result = await session.execute(
+                update(UserSubscription)
+                .where(UserSubscription.user_id == user_id)
+                .where(
+                    # NULL/0 means no limit, matching the falsy check the
+                    # other quota paths apply
+                    (UserSubscription.max_monthly_tokens.is_(None))
+                    | (UserSubscription.max_monthly_tokens == 0)
+                    | (UserSubscription.used_monthly_tokens + tokens_used
+                       <= UserSubscription.max_monthly_tokens)
+                )
+                .values(
+                    used_monthly_tokens=UserSubscription.used_monthly_tokens
+                    + tokens_used
+                )
+            )
+            await session.commit()
+
+            if result.rowcount == 0:
+                return False  # User not found or would exceed limit
+
+            self._invalidate_access_cache(user_id)
+            return True
+
+    async def reserve_tokens(self, user_id: str, feature: FeatureType, estimated_tokens: int) -> Dict:
+        """
+        Check feature access and reserve tokens in one locked transaction.
+
+        Replaces the separate check_feature_access + increment_token_usage
+        round trips on the LLM hot path: the subscription row is read FOR
+        UPDATE, validated, and charged the estimate in a single
+        SELECT/UPDATE pair, which also closes the race where two
+        concurrent calls both pass the quota check.
+
+        Args:
+            user_id: User ID to reserve tokens for
+            feature: Feature being accessed
+            estimated_tokens: Tokens to charge up front (settled later)
+
+        Returns:
+            Dictionary with access status, reason, and on success the
+            reservation fields consumed by settle_tokens
+        """
+        async with self._session() as session:
+            statement = (
+                select(UserSubscription)
+                .where(UserSubscription.user_id == user_id)
+                .with_for_update()
+            )
+            result = await session.execute(statement)
+            user_subscription = result.scalars().first()
 
             if not user_subscription:
-                return False  # User not found
+                return {
+                    "has_access": False,
+                    "is_subscribed": False,
+                    "reason": "User not found in subscription system"
+                }
+
+            if not user_subscription.is_premium:
+                return {
+                    "has_access": False,
+                    "is_subscribed": False,
+                    "reason": "User does not have premium subscription"
+                }
 
-            # Check if adding tokens would exceed the limit
-            new_usage = user_subscription.used_monthly_tokens + tokens_used
             if (user_subscription.max_monthly_tokens and
-                new_usage > user_subscription.max_monthly_tokens):
-                return False  # Would exceed limit
+                user_subscription.used_monthly_tokens + estimated_tokens
+                    > user_subscription.max_monthly_tokens):
+                return {
+                    "has_access": False,
+                    "is_subscribed": True,
+                    "reason": "Monthly token limit exceeded"
+                }
 
-            # Increment token usage
-            user_subscription.used_monthly_tokens = new_usage
+            user_subscription.used_monthly_tokens += estimated_tokens
             session.add(user_subscription)
-            session.commit()
+            await session.commit()
+            self._invalidate_access_cache(user_id)
 
-            return True
+            return {
+                "has_access": True,
+                "is_subscribed": True,
+                "reason": "Access granted",
+                "user_id": user_id,
+                "estimated_tokens": estimated_tokens
+            }
+
+    async def settle_tokens(self, reservation: Dict, actual_tokens: int) -> None:
+        """
+        Adjust a reservation to the tokens actually consumed.
+
+        Args:
+            reservation: Reservation dictionary returned by reserve_tokens
+            actual_tokens: Tokens the LLM call actually used
+        """
+        delta = actual_tokens - reservation["estimated_tokens"]
+        if delta == 0:
+            return
+
+        async with self._session() as session:
+            await session.execute(
+                update(UserSubscription)
+                .where(UserSubscription.user_id == reservation["user_id"])
+                .values(
+                    used_monthly_tokens=UserSubscription.used_monthly_tokens + delta
+                )
+            )
+            await session.commit()
+            self._invalidate_access_cache(reservation["user_id"])
+
+    async def increment_token_usage_bulk(self, deltas: Dict[str, int]) -> None:
+        """
+        Apply coalesced token deltas, one UPDATE per user, in one commit.
+
+        Used by the deferred accounting buffer: many buffered LLM calls
+        for the same user collapse into a single
+        `used_monthly_tokens = used_monthly_tokens + delta` statement.
+
+        Args:
+            deltas: Mapping of user_id to total tokens consumed
+        """
+        if not deltas:
+            return
+
+        async with self._session() as session:
+            for user_id, delta in deltas.items():
+                await session.execute(
+                    update(UserSubscription)
+                    .where(UserSubscription.user_id == user_id)
+                    .values(
+                        used_monthly_tokens=UserSubscription.used_monthly_tokens + delta
+                    )
+                )
+            await session.commit()
+            for user_id in deltas:
+                self._invalidate_access_cache(user_id)
 
-    def reset_monthly_usage(self, user_id: str) -> bool:
+    async def reset_monthly_usage(self, user_id: str) -> bool:
         """
         Reset the monthly token usage for a user (typically done at subscription renewal).
 
@@ -234,15 +417,17 @@ class PremiumFeatureAccess:
         Returns:
             True if successful, False otherwise
         """
-        with Session(self.engine) as session:
+        async with self._session() as session:
             statement = select(UserSubscription).where(UserSubscription.user_id == user_id)
-            user_subscription = session.exec(statement).first()
+            result = await session.execute(statement)
+            user_subscription = result.scalars().first()
 
             if not user_subscription:
                 return False  # User not found
 
             user_subscription.used_monthly_tokens = 0
             session.add(user_subscription)
-            session.commit()
+            await session.commit()
+            self._invalidate_access_cache(user_id)
 
             return True
\ No newline at end of file
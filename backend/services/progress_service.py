@@ -2,10 +2,12 @@
 Progress Service for Course Companion FTE
 Handles progress tracking, streak calculation, and user statistics
 """
-from datetime import datetime, timedelta
-from typing import List, Optional
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import Integer, cast, select, func, and_
+import orjson
 import pytz
 
 from backend.api.models.progress import Progress
@@ -14,7 +16,10 @@ from backend.api.models.course import Course
 from backend.api.models.quiz_attempt import QuizAttempt
 from backend.api.models.achievement import Achievement
 from backend.api.models.user import User
+from backend.api.models.user_streak import UserStreak
+from backend.api.schemas.progress import CourseProgressSummary, StreakInfo
 from backend.core.config import get_settings
+from backend.db.session import get_sessionmaker
 
 
 class ProgressService:
@@ -54,11 +59,15 @@ class ProgressService:
 
         now = datetime.utcnow()
 
+        # Get chapter info (also supplies the denormalized course_id)
+        chapter = await self.db.get(Chapter, chapter_id)
+
         if not progress:
             # Create new progress record
             progress = Progress(
                 user_id=user_id,
                 chapter_id=chapter_id,
+                course_id=chapter.course_id if chapter else None,
                 is_completed=True,
                 completed_at=now,
                 time_spent_seconds=time_spent_seconds or 0,
@@ -82,9 +91,6 @@ class ProgressService:
         await self.db.commit()
         await self.db.refresh(progress)
 
-        # Get chapter info
-        chapter = await self.db.get(Chapter, chapter_id)
-
         return {
             "chapter_id": chapter_id,
             "chapter_title": chapter.title if chapter else "Unknown",
@@ -94,117 +100,167 @@ class ProgressService:
             "last_accessed_at": progress.last_accessed_at
         }
 
-    async def get_user_progress(self, user_id: int) -> dict:
+    async def stream_overall_progress(self, user_id: int) -> AsyncIterator[bytes]:
         """
-        Get overall progress for a user
+        Stream overall progress as chunked JSON bytes
+
+        Yields the OverallProgressResponse payload piece by piece so large
+        course lists are never materialized in memory and the client can
+        start parsing before the last course summary is computed. The
+        streak and achievements reads run concurrently on their own
+        sessions while the summary rows stream, capping wall time at the
+        slowest query instead of the sum.
 
         Args:
             user_id: User database ID
 
-        Returns:
-            Dictionary with overall progress
+        Yields:
+            orjson-encoded chunks forming a complete JSON object
         """
-        # Get user
-        user = await self.db.get(User, user_id)
+        session_factory = get_sessionmaker()
+
+        # An AsyncSession handles one statement at a time, so the reads
+        # that overlap the summary stream each open their own session
+        # from the shared pool
+        async def _streak_info() -> dict:
+            async with session_factory() as session:
+                return await ProgressService(session).calculate_streak(user_id)
+
+        async def _achievements_count() -> int:
+            async with session_factory() as session:
+                result = await session.execute(
+                    select(func.count(Achievement.id))
+                    .where(Achievement.user_id == user_id)
+                )
+                return result.scalar() or 0
+
+        streak_task = asyncio.create_task(_streak_info())
+        achievements_task = asyncio.create_task(_achievements_count())
+
+        try:
+            # One aggregated query covers every published course
+            summaries_result = await self.db.execute(
+                self._course_summaries_query(user_id)
+            )
 
-        # Get all courses
-        courses_result = await self.db.execute(
-            select(Course).where(Course.is_published == True)
-        )
-        courses = courses_result.scalars().all()
+            yield b'{"user_id":' + orjson.dumps(user_id) + b',"courses":['
 
-        # Get course progress summaries
-        course_summaries = []
-        total_chapters_completed = 0
-        total_time_spent = 0
+            separator = b""
+            total_chapters_completed = 0
+            total_time_spent = 0
 
-        for course in courses:
-            summary = await self._get_course_progress_summary(user_id, course)
-            course_summaries.append(summary)
-            total_chapters_completed += summary["completed_chapters"]
-            total_time_spent += summary["time_spent_seconds"]
+            for row in summaries_result:
+                summary = self._summary_from_row(row)
+                total_chapters_completed += summary["completed_chapters"]
+                total_time_spent += summary["time_spent_seconds"]
 
-        # Get streak info
-        streak_info = await self.calculate_streak(user_id)
+                chunk = orjson.dumps(
+                    CourseProgressSummary(**summary).model_dump(mode="json")
+                )
+                yield separator + chunk
+                separator = b","
 
-        # Get achievements count
-        achievements_result = await self.db.execute(
-            select(func.count(Achievement.id))
-            .where(Achievement.user_id == user_id)
+            streak_info, achievements_count = await asyncio.gather(
+                streak_task, achievements_task
+            )
+        except BaseException:
+            streak_task.cancel()
+            achievements_task.cancel()
+            raise
+
+        yield (
+            b'],"total_chapters_completed":' + orjson.dumps(total_chapters_completed)
+            + b',"total_time_spent_seconds":' + orjson.dumps(total_time_spent)
+            + b',"streak":' + orjson.dumps(StreakInfo(**streak_info).model_dump(mode="json"))
+            + b',"achievements_earned":' + orjson.dumps(achievements_count)
+            + b'}'
         )
-        achievements_count = achievements_result.scalar() or 0
 
-        return {
-            "user_id": user_id,
-            "total_chapters_completed": total_chapters_completed,
-            "total_time_spent_seconds": total_time_spent,
-            "courses": course_summaries,
-            "streak": streak_info,
-            "achievements_earned": achievements_count
-        }
-
-    async def _get_course_progress_summary(
-        self,
-        user_id: int,
-        course: Course
-    ) -> dict:
+    def _course_summaries_query(self, user_id: int):
         """
-        Get progress summary for a specific course
+        Build the single aggregated query behind the course summaries
+
+        Joins published chapters (outer, so chapterless courses still
+        appear) and the user's progress rows, grouped by course, replacing
+        the old two-queries-per-course loop with one round trip.
 
         Args:
             user_id: User database ID
-            course: Course object
 
         Returns:
-            Dictionary with course progress summary
+            Selectable yielding one row per published course
         """
-        # Get all chapters for course
-        chapters_result = await self.db.execute(
-            select(Chapter)
-            .where(Chapter.course_id == course.id)
-            .where(Chapter.is_published == True)
+        return (
+            select(
+                Course.id,
+                Course.title,
+                Course.slug,
+                func.count(Chapter.id).label("total_chapters"),
+                func.count(Progress.id)
+                .filter(Progress.is_completed == True)
+                .label("completed_chapters"),
+                func.coalesce(func.sum(Progress.time_spent_seconds), 0)
+                .label("time_spent_seconds"),
+                func.max(Progress.last_accessed_at).label("last_accessed")
+            )
+            .outerjoin(
+                Chapter,
+                and_(
+                    Chapter.course_id == Course.id,
+                    Chapter.is_published == True
+                )
+            )
+            .outerjoin(
+                Progress,
+                and_(
+                    Progress.chapter_id == Chapter.id,
+                    Progress.user_id == user_id
+                )
+            )
+            .where(Course.is_published == True)
+            .group_by(Course.id, Course.title, Course.slug)
+            .order_by(Course.id)
         )
-        chapters = chapters_result.scalars().all()
-        total_chapters = len(chapters)
 
-        # Get user's progress on these chapters
-        chapter_ids = [ch.id for ch in chapters]
+    @staticmethod
+    def _summary_from_row(row) -> dict:
+        """
+        Build a course progress summary dict from an aggregate row
 
-        progress_result = await self.db.execute(
-            select(Progress)
-            .where(Progress.user_id == user_id)
-            .where(Progress.chapter_id.in_(chapter_ids))
-        )
-        progress_records = progress_result.scalars().all()
+        Args:
+            row: Row from _course_summaries_query
 
-        # Calculate statistics
-        completed_count = sum(1 for p in progress_records if p.is_completed)
-        total_time = sum(p.time_spent_seconds for p in progress_records)
+        Returns:
+            Dictionary with course progress summary
+        """
         progress_percentage = (
-            (completed_count / total_chapters * 100) if total_chapters > 0 else 0
-        )
-
-        # Get last accessed time
-        last_accessed = max(
-            (p.last_accessed_at for p in progress_records),
-            default=None
+            (row.completed_chapters / row.total_chapters * 100)
+            if row.total_chapters > 0 else 0
         )
 
         return {
-            "course_id": course.id,
-            "course_title": course.title,
-            "course_slug": course.slug,
-            "completed_chapters": completed_count,
-            "total_chapters": total_chapters,
+            "course_id": row.id,
+            "course_title": row.title,
+            "course_slug": row.slug,
+            "completed_chapters": row.completed_chapters,
+            "total_chapters": row.total_chapters,
             "progress_percentage": round(progress_percentage, 2),
-            "time_spent_seconds": total_time,
-            "last_accessed": last_accessed
+            "time_spent_seconds": row.time_spent_seconds,
+            "last_accessed": row.last_accessed
         }
 
     async def calculate_streak(self, user_id: int) -> dict:
         """
         Calculate user's learning streak
 
+        The per-day dedup and consecutive-run detection happen in SQL: a
+        gaps-and-islands query (distinct activity days minus their row
+        number form a constant per unbroken run) returns one small row
+        per streak, so the database ships a handful of aggregates instead
+        of every progress record. Days are bucketed with the user's
+        current UTC offset, matching the old per-row conversion except
+        for records that straddle a DST shift.
+
         Args:
             user_id: User database ID
 
@@ -215,15 +271,53 @@ class ProgressService:
         user = await self.db.get(User, user_id)
         user_tz = pytz.timezone(user.timezone if user else "UTC")
 
-        # Get all progress records ordered by date
-        progress_result = await self.db.execute(
-            select(Progress)
+        # Fast path: the user_streaks row is maintained incrementally on
+        # every completion, so most reads are a primary-key lookup with
+        # status derived in Python; the aggregate below only backfills
+        # users predating the table
+        streak = await self.db.get(UserStreak, user_id)
+        if streak and streak.last_activity_date:
+            return self._streak_info_from_row(streak, user_tz)
+
+        now_local = datetime.now(user_tz)
+        offset_seconds = int(now_local.utcoffset().total_seconds())
+
+        # Days since epoch in the user's timezone, deduplicated in SQL
+        activity_days = (
+            select(
+                cast(
+                    (func.extract("epoch", Progress.last_accessed_at)
+                     + offset_seconds) / 86400,
+                    Integer
+                ).label("day")
+            )
             .where(Progress.user_id == user_id)
-            .order_by(Progress.last_accessed_at.desc())
+            .distinct()
+            .cte("activity_days")
+        )
+
+        # Consecutive days share (day - row_number), so grouping by that
+        # difference yields one row per unbroken streak
+        streak_groups = (
+            select(
+                activity_days.c.day,
+                (activity_days.c.day
+                 - func.row_number().over(order_by=activity_days.c.day)
+                 ).label("grp")
+            )
+            .cte("streak_groups")
+        )
+
+        streaks_result = await self.db.execute(
+            select(
+                func.count().label("length"),
+                func.max(streak_groups.c.day).label("last_day")
+            )
+            .group_by(streak_groups.c.grp)
         )
-        progress_records = progress_result.scalars().all()
+        streaks = streaks_result.all()
 
-        if not progress_records:
+        if not streaks:
             return {
                 "current_streak": 0,
                 "longest_streak": 0,
@@ -232,51 +326,23 @@ class ProgressService:
                 "days_until_broken": None
             }
 
-        # Get unique activity dates
-        activity_dates = set()
-        for record in progress_records:
-            # Convert to user's timezone and get date
-            local_dt = record.last_accessed_at.replace(tzinfo=pytz.UTC).astimezone(user_tz)
-            activity_dates.add(local_dt.date())
-
-        # Sort dates
-        sorted_dates = sorted(activity_dates, reverse=True)
-
-        # Calculate current streak
-        current_streak = 0
-        today = datetime.now(user_tz).date()
-        yesterday = today - timedelta(days=1)
-
-        # Check if there's activity today or yesterday (with grace period)
-        if sorted_dates[0] >= yesterday:
-            current_date = sorted_dates[0]
-            current_streak = 1
-
-            # Count consecutive days
-            for i in range(1, len(sorted_dates)):
-                expected_date = current_date - timedelta(days=1)
-                if sorted_dates[i] == expected_date:
-                    current_streak += 1
-                    current_date = sorted_dates[i]
-                elif sorted_dates[i] < expected_date:
-                    # Gap found
-                    break
-
-        # Calculate longest streak
-        longest_streak = 0
-        temp_streak = 1
-
-        for i in range(len(sorted_dates) - 1):
-            if sorted_dates[i] - sorted_dates[i + 1] == timedelta(days=1):
-                temp_streak += 1
-                longest_streak = max(longest_streak, temp_streak)
-            else:
-                temp_streak = 1
+        epoch = date(1970, 1, 1)
+        today = now_local.date()
+        today_index = (today - epoch).days
 
-        longest_streak = max(longest_streak, temp_streak, current_streak)
+        # Current streak is the run containing today or yesterday (grace
+        # period); longest is simply the largest run
+        current_streak = next(
+            (length for length, last_day in streaks
+             if last_day >= today_index - 1),
+            0
+        )
+        longest_streak = max(length for length, last_day in streaks)
 
         # Determine streak status
-        last_activity = sorted_dates[0]
+        last_activity = epoch + timedelta(
+            days=max(last_day for length, last_day in streaks)
+        )
         days_since_activity = (today - last_activity).days
 
         if days_since_activity == 0:
@@ -297,27 +363,83 @@ class ProgressService:
             "days_until_broken": days_until_broken
         }
 
+    @staticmethod
+    def _streak_info_from_row(streak: UserStreak, user_tz) -> dict:
+        """
+        Derive the streak info dict from a maintained user_streaks row
+
+        Args:
+            streak: UserStreak row with a last_activity_date
+            user_tz: User's timezone
+
+        Returns:
+            Dictionary with streak information
+        """
+        today = datetime.now(user_tz).date()
+        last_activity = streak.last_activity_date.date()
+        days_since_activity = (today - last_activity).days
+
+        if days_since_activity == 0:
+            streak_status = "active"
+            days_until_broken = 1
+        elif days_since_activity == 1:
+            streak_status = "at_risk"
+            days_until_broken = 0
+        else:
+            streak_status = "broken"
+            days_until_broken = None
+
+        return {
+            # A stored streak that missed both today and yesterday is over
+            "current_streak": (
+                streak.current_streak if days_since_activity <= 1 else 0
+            ),
+            "longest_streak": streak.longest_streak,
+            "last_activity_date": datetime.combine(
+                last_activity, datetime.min.time()
+            ),
+            "streak_status": streak_status,
+            "days_until_broken": days_until_broken
+        }
+
     async def _update_user_streak(self, user_id: int, activity_time: datetime):
         """
-        Update streak information for all user's progress records
+        Update the user's streak row incrementally
+
+        Streak state lives in user_streaks (one row per user). A new
+        activity only needs the previous row: same local day is a no-op,
+        the day after extends the run, anything else starts a new one -
+        no rescan of progress history on the completion path.
 
         Args:
             user_id: User database ID
-            activity_time: Time of activity
+            activity_time: Time of activity (UTC)
         """
-        # Calculate streak
-        streak_info = await self.calculate_streak(user_id)
+        user = await self.db.get(User, user_id)
+        user_tz = pytz.timezone(user.timezone if user else "UTC")
+        today = (
+            activity_time.replace(tzinfo=pytz.UTC).astimezone(user_tz).date()
+        )
+
+        streak = await self.db.get(UserStreak, user_id)
+        if not streak:
+            streak = UserStreak(user_id=user_id)
+            self.db.add(streak)
 
-        # Update all progress records with current streak info
-        progress_result = await self.db.execute(
-            select(Progress).where(Progress.user_id == user_id)
+        last_date = (
+            streak.last_activity_date.date()
+            if streak.last_activity_date else None
         )
-        progress_records = progress_result.scalars().all()
 
-        for record in progress_records:
-            record.current_streak = streak_info["current_streak"]
-            record.longest_streak = streak_info["longest_streak"]
-            record.last_activity_date = streak_info["last_activity_date"]
+        if last_date != today:
+            if last_date == today - timedelta(days=1):
+                streak.current_streak += 1
+            else:
+                streak.current_streak = 1
+
+        streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+        streak.last_activity_date = datetime.combine(today, datetime.min.time())
+        streak.updated_at = activity_time
 
     async def get_user_stats(self, user_id: int) -> dict:
         """
@@ -3,7 +3,6 @@ Quiz Service for Course Companion FTE
 Handles quiz retrieval and rule-based grading (NO LLM)
 CONSTITUTIONAL REQUIREMENT: All grading must be deterministic and rule-based
 """
-import json
 import re
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
@@ -132,7 +131,8 @@ class QuizService:
         feedback = []
         correct_count = 0
         points_earned = 0
-        total_points = sum(q.points for q in questions)
+        # Denormalized on the quiz row, maintained by Question event listeners
+        total_points = quiz.total_points
 
         for question in questions:
             user_answer = answers.get(question.id, "")
@@ -171,7 +171,7 @@ class QuizService:
             user_id=user_id,
             quiz_id=quiz_id,
             attempt_number=attempt_count + 1,
-            answers=json.dumps(answers),
+            answers=answers,
             score=score,
             correct_count=correct_count,
             total_questions=len(questions),
@@ -179,7 +179,7 @@ class QuizService:
             started_at=datetime.utcnow(),
             submitted_at=datetime.utcnow(),
             time_taken_seconds=time_taken_seconds,
-            feedback=json.dumps(feedback)
+            feedback=feedback
         )
 
         self.db.add(quiz_attempt)
@@ -217,7 +217,7 @@ class QuizService:
             Tuple of (is_correct, correct_answer, explanation)
         """
         # Parse answer configuration
-        answer_config = json.loads(question.answer_config)
+        answer_config = question.answer_config
 
         if question.question_type == "multiple_choice":
             return self._grade_multiple_choice(
@@ -7,7 +7,7 @@ import json
 import numpy as np
 from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
+from sqlalchemy import select, or_, and_, text
 import time
 
 from backend.api.models.chapter import Chapter
@@ -179,10 +179,77 @@ class SearchService:
         # - Generate query embedding
         # - Compare with stored embeddings using cosine similarity
 
-        # For now, fall back to keyword search
+        # For now, fall back to keyword search. Once the query embedding is
+        # produced (offline model), call search_by_embedding so ranking runs
+        # inside PostgreSQL on the pgvector HNSW index.
         # TODO: Implement full semantic search with local embeddings
         return await self.search_keyword(query, limit, course_id)
 
+    async def search_by_embedding(
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        course_id: Optional[int] = None
+    ) -> List[dict]:
+        """
+        k-nearest-neighbour search executed inside PostgreSQL via pgvector
+
+        Ranking happens on the HNSW index (`embedding <=> :vec`), so Python
+        never loops over chapter embeddings. Requires the pgvector column
+        from migration 005; on other dialects callers should use the
+        keyword/cosine fallbacks.
+
+        Args:
+            query_embedding: Pre-computed query vector (offline model, NO LLM)
+            limit: Maximum results
+            course_id: Optional course filter
+
+        Returns:
+            List of search results ranked by cosine similarity
+        """
+        if self.db.get_bind().dialect.name != "postgresql":
+            return []
+
+        course_filter = "AND c.course_id = :course_id" if course_id else ""
+        sql = text(
+            f"""
+            SELECT c.id, c.chapter_number, c.title, c.description,
+                   c.course_id, co.title AS course_title,
+                   1 - (c.embedding <=> :query_vec) AS similarity
+            FROM chapters c
+            JOIN courses co ON co.id = c.course_id
+            WHERE c.is_published = TRUE
+              AND c.embedding IS NOT NULL
+              {course_filter}
+            ORDER BY c.embedding <=> :query_vec
+            LIMIT :limit
+            """
+        )
+
+        params = {
+            # pgvector literal syntax: "[v1,v2,...]"
+            "query_vec": "[" + ",".join(map(str, query_embedding)) + "]",
+            "limit": limit,
+        }
+        if course_id:
+            params["course_id"] = course_id
+
+        result = await self.db.execute(sql, params)
+
+        return [
+            {
+                "chapter_id": row.id,
+                "chapter_number": row.chapter_number,
+                "chapter_title": row.title,
+                "course_id": row.course_id,
+                "course_title": row.course_title,
+                "excerpt": row.description[:200],
+                "relevance_score": float(row.similarity),
+                "match_type": "semantic"
+            }
+            for row in result
+        ]
+
     async def search_hybrid(
         self,
         query: str,
@@ -5,10 +5,15 @@ This module provides functionality for tracking token usage per user
 and per feature, enabling cost calculation and monitoring.
 """
 
+import asyncio
 import datetime
-from typing import Dict, List, Optional
+import functools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 from sqlmodel import SQLModel, Field, create_engine, Session, select
 from sqlalchemy import Column, DateTime
+from sqlalchemy.ext.asyncio import create_async_engine
 from pydantic import BaseModel
 
 
@@ -40,6 +45,218 @@ class TokenUsageCreate(BaseModel):
     model_used: str
 
 
+@functools.lru_cache(maxsize=None)
+def get_shared_engine(db_url: str):
+    """
+    One engine (and connection pool) per database URL.
+
+    The Phase-2 services (token tracking, premium access) used to build a
+    private engine each; sharing one pool avoids redundant connections
+    and the create_all round trip on every service construction. Server
+    databases get an explicitly sized pool with pre-ping and recycling,
+    mirroring the async app engine; SQLite keeps its driver-specific
+    pooling, which rejects those arguments.
+    """
+    pool_kwargs = {}
+    if not db_url.startswith("sqlite"):
+        pool_kwargs = {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        }
+
+    engine = create_engine(db_url, **pool_kwargs)
+    SQLModel.metadata.create_all(engine)  # Create tables if they don't exist
+    return engine
+
+
+@functools.lru_cache(maxsize=None)
+def get_shared_async_engine(db_url: str):
+    """
+    One async engine per database URL, for the awaitable Phase-2 paths.
+
+    Forces an async driver onto bare URLs the way the app engine does,
+    and applies the same pool settings as get_shared_engine. Table
+    creation is left to the first session user (run_sync cannot happen
+    here in a sync function).
+    """
+    if db_url.startswith("postgresql://"):
+        db_url = db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    elif db_url.startswith("sqlite://"):
+        db_url = db_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+    pool_kwargs = {}
+    if not db_url.startswith("sqlite"):
+        pool_kwargs = {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        }
+
+    return create_async_engine(db_url, **pool_kwargs)
+
+
+class _UsageBuffer:
+    """
+    Process-wide buffer that amortizes token accounting writes.
+
+    Each LLM call used to cost two immediate writes (usage INSERT plus a
+    subscription UPDATE). Rows are buffered here instead and flushed in
+    bulk once FLUSH_MAX_ROWS accumulate or the oldest row passes
+    FLUSH_MAX_AGE_SECONDS, so the per-call write cost amortizes to
+    near zero. Per-user token deltas are coalesced along the way, so one
+    UPDATE per user applies the whole batch.
+    """
+
+    FLUSH_MAX_ROWS = 500
+    FLUSH_MAX_AGE_SECONDS = 5.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: List[TokenUsageCreate] = []
+        self._token_deltas: Dict[str, int] = {}
+        self._oldest_at: Optional[float] = None
+
+    def add(self, usage_create: "TokenUsageCreate", count_tokens: bool = True) -> bool:
+        """Buffer one usage row; returns True when a flush is due."""
+        with self._lock:
+            if self._oldest_at is None:
+                self._oldest_at = time.monotonic()
+
+            self._rows.append(usage_create)
+            if count_tokens:
+                self._token_deltas[usage_create.user_id] = (
+                    self._token_deltas.get(usage_create.user_id, 0)
+                    + usage_create.total_tokens
+                )
+
+            return (
+                len(self._rows) >= self.FLUSH_MAX_ROWS
+                or time.monotonic() - self._oldest_at >= self.FLUSH_MAX_AGE_SECONDS
+            )
+
+    def drain(self) -> Tuple[List["TokenUsageCreate"], Dict[str, int]]:
+        """Take everything buffered so far and reset."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            deltas, self._token_deltas = self._token_deltas, {}
+            self._oldest_at = None
+            return rows, deltas
+
+
+_usage_buffer = _UsageBuffer()
+
+# Last (tracker, premium_access) pair seen by record_usage_deferred; the
+# periodic flusher and the shutdown drain flush through these so they do
+# not need the service instances plumbed in
+_flush_targets: Optional[Tuple["TokenUsageTracker", object]] = None
+
+
+def record_usage_deferred(
+    usage_create: "TokenUsageCreate",
+    tracker: "TokenUsageTracker",
+    premium_access,
+    tokens_already_reserved: bool = False
+) -> None:
+    """
+    Buffer the accounting writes for one LLM call.
+
+    The usage INSERT (and, unless the caller charged the subscription up
+    front via reserve_tokens, the token-counter increment) is taken off
+    the request hot path; when the shared buffer comes due it is flushed
+    as one bulk INSERT plus one coalesced UPDATE per user. Token limits
+    are still enforced at access-check time, so the slight staleness of
+    the counter is bounded by the flush interval.
+
+    Args:
+        usage_create: Token usage data to record
+        tracker: TokenUsageTracker that will receive the bulk insert
+        premium_access: PremiumFeatureAccess that will apply token deltas
+        tokens_already_reserved: True when reserve_tokens/settle_tokens
+            already charged the subscription row for this call
+    """
+    if usage_create.cost_usd == 0:
+        usage_create.cost_usd = tracker.calculate_cost(
+            usage_create.input_tokens,
+            usage_create.output_tokens,
+            usage_create.model_used
+        )
+
+    global _flush_targets
+    _flush_targets = (tracker, premium_access)
+
+    if _usage_buffer.add(usage_create, count_tokens=not tokens_already_reserved):
+        _schedule_flush(tracker, premium_access)
+
+
+def _schedule_flush(tracker: "TokenUsageTracker", premium_access) -> None:
+    """
+    Flush without blocking the caller's event loop.
+
+    The flush commits through a synchronous Session; inside a running
+    loop it is pushed to a worker thread, otherwise it runs inline.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush_usage_buffer(tracker, premium_access)
+        return
+
+    loop.run_in_executor(None, flush_usage_buffer, tracker, premium_access)
+
+
+async def drain_usage_buffer() -> int:
+    """
+    Flush everything buffered so far from async context (off-thread).
+
+    Called by the periodic flusher and the application shutdown hook, so
+    quiet periods and restarts cannot strand buffered rows.
+
+    Returns:
+        Number of usage rows written
+    """
+    if _flush_targets is None:
+        return 0
+
+    tracker, premium_access = _flush_targets
+    return await asyncio.to_thread(flush_usage_buffer, tracker, premium_access)
+
+
+async def run_usage_flush_loop(
+    interval_seconds: float = _UsageBuffer.FLUSH_MAX_AGE_SECONDS
+) -> None:
+    """
+    Drain the usage buffer on a timer (run as a background task).
+
+    The size/age checks in record_usage_deferred only fire on the next
+    call, so without this loop a quiet period would leave rows buffered
+    indefinitely.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await drain_usage_buffer()
+
+
+def flush_usage_buffer(tracker: "TokenUsageTracker", premium_access) -> int:
+    """
+    Flush all buffered accounting writes (also call this on shutdown).
+
+    Returns:
+        Number of usage rows written
+    """
+    rows, deltas = _usage_buffer.drain()
+
+    # One transaction covers the bulk INSERT and the quota UPDATEs, so
+    # the usage log and subscription counters cannot drift apart on a
+    # mid-flush failure (the services share one engine per db_url)
+    if rows or deltas:
+        tracker.record_and_increment_bulk(rows, deltas)
+
+    return len(rows)
+
+
 class TokenUsageTracker:
     """
     Service class for tracking and managing token usage for cost calculation.
@@ -52,8 +269,7 @@ class TokenUsageTracker:
         Args:
             db_url: Database connection URL
         """
-        self.engine = create_engine(db_url)
-        SQLModel.metadata.create_all(self.engine)  # Create tables if they don't exist
+        self.engine = get_shared_engine(db_url)
 
     def calculate_cost(self, input_tokens: int, output_tokens: int, model: str = "claude-3-sonnet-20240229") -> float:
         """
@@ -119,6 +335,99 @@ class TokenUsageTracker:
 
             return record
 
+    def record_usage_bulk(self, usage_creates: List[TokenUsageCreate]) -> int:
+        """
+        Record many token usage rows in one INSERT.
+
+        Used by batch workflows so a flushed batch costs one round trip
+        instead of one commit per record.
+
+        Args:
+            usage_creates: Token usage data to record
+
+        Returns:
+            Number of records inserted
+        """
+        if not usage_creates:
+            return 0
+
+        mappings = self._usage_mappings(usage_creates)
+
+        with Session(self.engine) as session:
+            session.bulk_insert_mappings(TokenUsageRecord, mappings)
+            session.commit()
+
+        return len(mappings)
+
+    def record_and_increment_bulk(
+        self,
+        usage_creates: List[TokenUsageCreate],
+        token_deltas: Dict[str, int]
+    ) -> int:
+        """
+        Apply a drained accounting batch in one transaction.
+
+        One bulk usage INSERT plus one coalesced quota UPDATE per user,
+        committed together so the usage log and the subscription token
+        counters stay consistent even if a flush fails midway.
+
+        Args:
+            usage_creates: Token usage rows to insert
+            token_deltas: Coalesced token increments per user_id
+
+        Returns:
+            Number of usage rows inserted
+        """
+        # Imported at call time: premium_access imports this module for
+        # the shared engine, so a top-level import would be circular
+        from sqlalchemy import update
+        from .premium_access import UserSubscription
+
+        if not usage_creates and not token_deltas:
+            return 0
+
+        mappings = self._usage_mappings(usage_creates)
+
+        with Session(self.engine) as session:
+            if mappings:
+                session.bulk_insert_mappings(TokenUsageRecord, mappings)
+            for user_id, delta in token_deltas.items():
+                session.execute(
+                    update(UserSubscription)
+                    .where(UserSubscription.user_id == user_id)
+                    .values(
+                        used_monthly_tokens=UserSubscription.used_monthly_tokens
+                        + delta
+                    )
+                )
+            session.commit()
+
+        return len(mappings)
+
+    def _usage_mappings(self, usage_creates: List[TokenUsageCreate]) -> List[Dict]:
+        """Build insert mappings (one shared timestamp, costs filled in)."""
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        mappings = []
+        for usage_create in usage_creates:
+            cost_usd = usage_create.cost_usd
+            if cost_usd == 0:
+                cost_usd = self.calculate_cost(
+                    usage_create.input_tokens,
+                    usage_create.output_tokens,
+                    usage_create.model_used
+                )
+            mappings.append({
+                "user_id": usage_create.user_id,
+                "feature": usage_create.feature,
+                "input_tokens": usage_create.input_tokens,
+                "output_tokens": usage_create.output_tokens,
+                "total_tokens": usage_create.total_tokens,
+                "cost_usd": cost_usd,
+                "timestamp": timestamp,
+                "model_used": usage_create.model_used
+            })
+        return mappings
+
     def get_user_usage(self, user_id: str, days_back: int = 30) -> List[TokenUsageRecord]:
         """
         Get token usage for a specific user within a time range.
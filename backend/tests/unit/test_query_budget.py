@@ -0,0 +1,86 @@
+"""
+Query-budget regression tests for Course Companion FTE
+Asserts the hot course read paths stay within their SQL round-trip
+budgets, so a reintroduced N+1 (e.g. a lazily-walked relationship)
+fails loudly instead of shipping
+"""
+import uuid
+
+import pytest
+from sqlmodel import SQLModel
+
+from backend.api.models.chapter import Chapter
+from backend.api.models.course import Course
+from backend.services.content_service import ContentService
+
+
+@pytest.fixture
+async def course_tables(async_engine):
+    """
+    Create the SQLModel tables these tests read.
+
+    The shared `tables` fixture builds Base.metadata, but the app models
+    register on SQLModel.metadata, so it is created here (idempotently).
+    """
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+@pytest.fixture
+async def published_course(course_tables, async_session):
+    """A published course with three published chapters"""
+    suffix = uuid.uuid4().hex[:8]
+    course = Course(
+        slug=f"query-budget-{suffix}",
+        title="Query Budget Course",
+        description="Course used to catch N+1 regressions",
+        total_chapters=3,
+        is_published=True,
+    )
+    async_session.add(course)
+    await async_session.commit()
+    await async_session.refresh(course)
+
+    for number in range(1, 4):
+        async_session.add(Chapter(
+            course_id=course.id,
+            chapter_number=number,
+            slug=f"chapter-{number}-{suffix}",
+            title=f"Chapter {number}",
+            description="Query budget test chapter",
+            content_key=f"query-budget/{suffix}/chapter-{number}.md",
+        ))
+    await async_session.commit()
+
+    # refresh() above eagerly loaded the (then-empty) chapters collection;
+    # expire it so the service queries see the rows inserted afterwards
+    async_session.expire(course, ["chapters"])
+
+    return course
+
+
+@pytest.mark.asyncio
+async def test_list_courses_stays_within_query_budget(
+    async_session, published_course, assert_query_count
+):
+    service = ContentService(async_session, r2_client=None)
+
+    # One SELECT for the courses plus one batched selectin IN-query for
+    # their published chapters, regardless of how many courses exist
+    with assert_query_count(2):
+        courses = await service.list_courses()
+
+    course = next(c for c in courses if c.id == published_course.id)
+    assert len(course.chapters) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_course_chapters_is_a_single_query(
+    async_session, published_course, assert_query_count
+):
+    service = ContentService(async_session, r2_client=None)
+
+    with assert_query_count(1):
+        chapters = await service.get_course_chapters(published_course.id)
+
+    assert [chapter.chapter_number for chapter in chapters] == [1, 2, 3]
@@ -17,9 +17,9 @@ def test_hash_password():
     hashed = hash_password(password)
 
     # Verify the hash is not the same as the original password
-    assert hashed != password
+    assert hashed != password.encode("utf-8")
     # Verify the hash contains the expected bcrypt prefix
-    assert hashed.startswith("$2b$")
+    assert hashed.startswith(b"$2b$")
 
 
 def test_verify_password_correct():